@@ -34,6 +34,7 @@ from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.u
 from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
     smartcs_provider_spec,
     handle_template,
+    handle_working_path,
 )
 from ansible.module_utils._text import to_text
 from ansible.utils.display import Display
@@ -136,6 +137,14 @@ class ActionModule(ActionNetworkModule):
                     handle_template(self)
                 except ValueError as exc:
                     return dict(failed=True, msg=to_text(exc))
+            if self._task.args.get('output_dir'):
+                handle_working_path(self, 'output_dir')
+            if self._task.args.get('timeout_profile_dir'):
+                handle_working_path(self, 'timeout_profile_dir')
+
+        if module_name in ["smartcs_facts", "facts"]:
+            if self._task.args.get('cache_dir'):
+                handle_working_path(self, 'cache_dir')
 
         result = super(ActionModule, self).run(task_vars=task_vars)
         if warnings:
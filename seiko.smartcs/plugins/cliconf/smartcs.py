@@ -30,14 +30,51 @@ description:
 - This smartcs plugin provides low level abstraction apis for sending and receiving CLI
   commands from SmartCS devices.
 version_added: 1.3.0
+options:
+  config_cache:
+    description:
+    - Keeps the configuration fetched by get_config on the persistent connection and
+      returns it to the following tasks until a command that can change the configuration
+      is sent on the connection.
+    - Disable it when the configuration can be changed by other sessions while the
+      connection is open.
+    type: boolean
+    default: true
+    vars:
+    - name: ansible_smartcs_config_cache
+    version_added: "1.8.0"
+  config_batch_size:
+    description:
+    - Number of configuration lines edit_config sends to the device before it waits
+      for the prompts of the lines. The output is split back into one response per
+      line and every response is checked for errors.
+    - When a line of a batch fails, the following lines of the same batch have already
+      been sent to the device. Lines that expect a prompt are always sent one by one.
+    - The default C(1) sends and waits for each line.
+    type: int
+    default: 1
+    vars:
+    - name: ansible_smartcs_config_batch_size
+    version_added: "1.8.0"
+  defaults_flag_cache:
+    description:
+    - Path of a file on the controller where the filter found by get_defaults_flag is
+      kept per firmware version, so it is not looked up again on a new connection to a
+      device running the same firmware.
+    - The filter is always kept on the persistent connection for the session.
+    type: path
+    vars:
+    - name: ansible_smartcs_defaults_flag_cache
+    version_added: "1.8.0"
 """
 
 import re
+import socket
 import time
 import json
 
 from ansible.errors import AnsibleConnectionFailure
-from ansible.module_utils._text import to_text
+from ansible.module_utils._text import to_bytes, to_text
 from ansible.module_utils.common._collections_compat import Mapping
 from ansible.module_utils.six import iteritems
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.config import (
@@ -48,6 +85,27 @@ from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.u
     to_list,
 )
 from ansible.plugins.cliconf import CliconfBase, enable_mode
+from ansible_collections.seiko.smartcs.plugins.terminal.smartcs import (
+    PROMPT_LINE_RE,
+    TerminalModule,
+)
+from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
+    config_digest,
+    diff_flat_config,
+    read_cache_file,
+    write_cache_file,
+)
+
+# Commands that never change the configuration of the device
+READ_ONLY_COMMANDS = frozenset(['show', 'terminal', 'ttysend', 'ttysendwaitset'])
+
+# The ttymanage settings of the strings that end a ttysendwaitset when received
+WAIT_ENTRY_SETTINGS = ('terminal ttymanage waitstr ', 'terminal ttymanage waitregex ',
+                       'terminal ttymanage errorregex ')
+
+# Seconds without output after which the terminator of a banner or macro is
+# sent even though the echo of its last line was not seen
+ECHO_TIMEOUT = 1
 
 
 class Cliconf(CliconfBase):
@@ -70,7 +128,31 @@ class Cliconf(CliconfBase):
         cmd += ' '.join(to_list(flags))
         cmd = cmd.strip()
 
-        return self.send_command(cmd)
+        if not self.get_option('config_cache'):
+            return self.send_command(cmd)
+
+        config = self._get_session_cache().get('config', {}).get(cmd)
+        if config is None:
+            config = self.send_command(cmd)
+            self._get_session_cache().setdefault('config', {})[cmd] = config
+        return config
+
+    def get_config_digest(self, source='running'):
+        """
+        Returns the digest of the configuration normalized for the comparison
+        of the running and startup configurations
+        :param source: The source of the configuration, running or startup
+        :return: Returns the SHA-256 hex digest. The startup digest is kept on the
+                 connection until a command that can change it is sent.
+        """
+        cache = self.get_option('config_cache') and source == 'startup'
+        if cache and source in self._get_session_cache().get('digest', {}):
+            return self._get_session_cache()['digest'][source]
+
+        digest = config_digest(self.get_config(source=source), source)
+        if cache:
+            self._get_session_cache().setdefault('digest', {})[source] = digest
+        return digest
 
     def get_diff(self, candidate=None, running=None, diff_match='line', diff_ignore_lines=None, path=None, diff_replace=None):
         diff = {}
@@ -92,28 +174,37 @@ class Cliconf(CliconfBase):
         if path:
             raise ValueError("'path' in diff is not supported")
 
-        # prepare candidate configuration
-        candidate_obj = NetworkConfig(indent=1)
         want_src, want_banners = self._extract_banners(candidate)
-        candidate_obj.load(want_src)
-
+        have_src, have_banners = None, {}
         if running and diff_match != 'none':
-            # running configuration
             have_src, have_banners = self._extract_banners(running)
-            running_obj = NetworkConfig(indent=1, contents=have_src, ignore_lines=diff_ignore_lines)
-            configdiffobjs = candidate_obj.difference(running_obj, path=path, match=diff_match, replace=diff_replace)
 
+        # SmartCS configurations are flat, so the lines are compared through a
+        # hash set and the NetworkConfig trees are only built for indented lines.
+        config_diff = diff_flat_config(want_src, have_src)
+        if config_diff is not None:
+            diff['config_diff'] = '\n'.join(config_diff)
         else:
-            configdiffobjs = candidate_obj.items
-            have_banners = {}
+            # prepare candidate configuration
+            candidate_obj = NetworkConfig(indent=1)
+            candidate_obj.load(want_src)
+
+            if have_src is not None:
+                # running configuration
+                running_obj = NetworkConfig(indent=1, contents=have_src, ignore_lines=diff_ignore_lines)
+                configdiffobjs = candidate_obj.difference(running_obj, path=path, match=diff_match, replace=diff_replace)
+
+            else:
+                configdiffobjs = candidate_obj.items
+
+            diff['config_diff'] = dumps(configdiffobjs, 'commands') if configdiffobjs else ''
 
-        diff['config_diff'] = dumps(configdiffobjs, 'commands') if configdiffobjs else ''
         banners = self._diff_banners(want_banners, have_banners)
         diff['banner_diff'] = banners if banners else {}
         return diff
 
     @enable_mode
-    def edit_config(self, candidate=None, commit=True, replace=None, comment=None):
+    def edit_config(self, candidate=None, commit=True, replace=None, comment=None, timings=False):
         resp = {}
         operations = self.get_device_operations()
         self.check_edit_config_capability(operations, candidate, commit, replace, comment)
@@ -121,14 +212,37 @@ class Cliconf(CliconfBase):
         results = []
         requests = []
         if commit:
+            self._invalidate_config_cache()
+            lines = []
             for line in to_list(candidate):
                 if not isinstance(line, Mapping):
                     line = {'command': line}
 
                 cmd = line['command']
                 if cmd != 'end' and cmd[0] != '!':
-                    results.append(self.send_command(**line))
+                    lines.append(line)
                     requests.append(cmd)
+
+            batched = True
+            command_timings = []
+            for batch in self._config_batches(lines, self.get_option('config_batch_size')):
+                start = time.time()
+                if batched and len(batch) > 1:
+                    batch_results = self._send_config_batch([line['command'] for line in batch])
+                    if batch_results is None:
+                        # The output could not be split per line, send the rest one by one
+                        batched = False
+                        batch_results = [''] * len(batch)
+                else:
+                    batch_results = [self.send_command(**line) for line in batch]
+                results.extend(batch_results)
+                if timings:
+                    # The lines of a batch share the time of the batch
+                    elapsed = (time.time() - start) / len(batch)
+                    for line, out in zip(batch, batch_results):
+                        command_timings.append(self._command_timing(line['command'], out, elapsed))
+            if timings:
+                resp['timings'] = command_timings
         else:
             raise ValueError('check mode is not supported')
 
@@ -139,12 +253,14 @@ class Cliconf(CliconfBase):
     def edit_macro(self, candidate=None, commit=True, replace=None, comment=None):
         resp = {}
         operations = self.get_device_operations()
-        self.check_edit_config_capabiltiy(operations, candidate, commit, replace, comment)
+        self.check_edit_config_capability(operations, candidate, commit, replace, comment)
 
         results = []
         requests = []
         if commit:
+            self._invalidate_config_cache()
             commands = ''
+            start = time.time()
             for line in candidate:
                 if line != 'None':
                     commands += (' ' + line + '\n')
@@ -152,9 +268,10 @@ class Cliconf(CliconfBase):
                 results.append(self.send_command(**obj))
                 requests.append(commands)
 
-            time.sleep(0.1)
+            self._wait_for_echo(commands)
             results.append(self.send_command('\n'))
             requests.append('\n')
+            self._log_elapsed('edit_macro', start)
 
         resp['request'] = requests
         resp['response'] = results
@@ -169,6 +286,11 @@ class Cliconf(CliconfBase):
         return self.send_command(command=command, prompt=prompt, answer=answer, sendonly=sendonly, check_all=check_all)
 
     def get_device_info(self):
+        # show version does not change while the session is open
+        device_info = self._get_session_cache().get('device_info')
+        if device_info is not None:
+            return dict(device_info)
+
         device_info = {}
 
         device_info['network_os'] = 'smartcs'
@@ -183,6 +305,11 @@ class Cliconf(CliconfBase):
         if match:
             device_info['network_model'] = match.group(1)
 
+        match = re.search(r'Serial No.            : (.*)', data)
+        if match:
+            device_info['network_os_serialnum'] = match.group(1)
+
+        self._get_session_cache()['device_info'] = dict(device_info)
         return device_info
 
     def get_device_operations(self):
@@ -210,7 +337,8 @@ class Cliconf(CliconfBase):
 
     def get_capabilities(self):
         result = dict()
-        result['rpc'] = self.get_base_rpc() + ['edit_banner', 'get_diff', 'run_commands', 'get_defaults_flag']
+        result['rpc'] = self.get_base_rpc() + ['edit_banner', 'get_config_digest', 'get_diff', 'run_commands',
+                                               'run_tty_script', 'get_defaults_flag']
         result['network_api'] = 'cliconf'
         result['device_info'] = self.get_device_info()
         result['device_operations'] = self.get_device_operations()
@@ -234,26 +362,30 @@ class Cliconf(CliconfBase):
         results = []
         requests = []
         if commit:
+            self._invalidate_config_cache()
             for key, value in iteritems(banners_obj):
+                start = time.time()
                 for cmd in [key, value]:
                     obj = {'command': cmd, 'sendonly': True}
                     results.append(self.send_command(**obj))
                     requests.append(cmd)
 
-                time.sleep(0.1)
+                self._wait_for_echo(value)
                 results.append(self.send_command('\n'))
                 requests.append('\n')
+                self._log_elapsed('edit_banner %s' % key, start)
 
         resp['request'] = requests
         resp['response'] = results
 
         return resp
 
-    def run_commands(self, commands=None, check_rc=True):
+    def run_commands(self, commands=None, check_rc=True, timings=False):
         if commands is None:
             raise ValueError("'commands' value is required")
 
         responses = list()
+        command_timings = list()
         for cmd in to_list(commands):
             if not isinstance(cmd, Mapping):
                 cmd = {'command': cmd}
@@ -262,6 +394,16 @@ class Cliconf(CliconfBase):
             if output:
                 raise ValueError("'output' value %s is not supported for run_commands" % output)
 
+            if self._ttymanage_setting(cmd)[0]:
+                self._get_session_cache().pop('ttymanage', None)
+                self._get_session_cache()['ttymanage_cleared'] = False
+            if to_text(cmd['command']).split(' ', 1)[0] not in READ_ONLY_COMMANDS:
+                # unlike the edit methods, these commands include write and
+                # may change the startup configuration as well
+                self._invalidate_config_cache()
+                self._get_session_cache().pop('digest', None)
+
+            start = time.time()
             try:
                 out = self.send_command(**cmd)
             except AnsibleConnectionFailure as e:
@@ -270,15 +412,223 @@ class Cliconf(CliconfBase):
                 out = getattr(e, 'err', to_text(e))
 
             responses.append(out)
+            if timings:
+                command_timings.append(self._command_timing(cmd['command'], out, time.time() - start))
+
+        if timings:
+            return {'responses': responses, 'timings': command_timings}
+        return responses
+
+    def run_tty_script(self, settings=None, ttys=None, check_rc=True, timings=False):
+        """
+        Execute a whole ttymanage script in a single request
+        :param settings: List of terminal ttymanage commands (nl, timeout, after_error,
+               waitstr, waitregex and errorregex) applied before any tty is driven
+        :param ttys: List of dicts with the tty number (tty) and the commands sent to it (commands)
+        :param check_rc: Boolean value that indicates if a command error raises an exception
+        :param timings: Boolean value that indicates if the timings of the commands are returned
+        :return: Returns a dict with the responses to the settings actually sent (settings) and
+                 the responses of each tty (ttys) in the requested order. With timings, the
+                 timings of the settings (timings) and of each tty are added.
+        """
+        resp = {}
+        settings = self._apply_ttymanage_settings(to_list(settings), check_rc=check_rc, timings=timings)
+        if timings:
+            resp['timings'] = settings['timings']
+            settings = settings['responses']
+        resp['settings'] = settings
+        resp['ttys'] = []
+        for item in to_list(ttys):
+            out = self.run_commands(item['commands'], check_rc=check_rc, timings=timings)
+            if timings:
+                resp['ttys'].append({'tty': item['tty'], 'responses': out['responses'], 'timings': out['timings']})
+            else:
+                resp['ttys'].append({'tty': item['tty'], 'responses': out})
+
+        return resp
+
+    def _apply_ttymanage_settings(self, settings, check_rc=True, timings=False):
+        # The ttymanage settings belong to the CLI session, so the values already
+        # applied by a previous request on the same session are not sent again.
+        # A new session has no waitstr, waitregex or errorregex entry, so
+        # clearing one that was never set is not sent either, unless ttymanage
+        # commands were sent through run_commands.
+        cache = self._get_session_cache()
+        applied = dict(cache.get('ttymanage', {}))
+        cleared = cache.get('ttymanage_cleared', True)
+        delta = []
+        for cmd in settings:
+            key, value = self._ttymanage_setting(cmd)
+            if key in applied or not cleared or not (key or '').startswith(WAIT_ENTRY_SETTINGS):
+                if applied.get(key) != value:
+                    delta.append(cmd)
+            elif to_text(value).strip():
+                delta.append(cmd)
+
+        responses = self.run_commands(delta, check_rc=check_rc, timings=timings)
+
+        for cmd in delta:
+            key, value = self._ttymanage_setting(cmd)
+            applied[key] = value
+        cache['ttymanage'] = applied
+        cache['ttymanage_cleared'] = cleared
 
         return responses
 
+    def _ttymanage_setting(self, cmd):
+        if isinstance(cmd, Mapping):
+            command, value = cmd.get('command'), cmd.get('answer')
+        else:
+            command, value = cmd, None
+
+        match = re.match(r'terminal ttymanage (nl|timeout|after_error|waitstr|waitregex|errorregex)\b(.*)',
+                         to_text(command or ''))
+        if not match:
+            return None, None
+        if value is None:
+            return 'terminal ttymanage %s' % match.group(1), match.group(2).strip()
+        return 'terminal ttymanage %s%s' % (match.group(1), match.group(2)), value
+
+    def _wait_for_echo(self, command):
+        """
+        Waits until the device echoes the last line of a command sent with
+        sendonly. When the echo does not show up as sent (line wrapping, redraw
+        sequences), it gives up after ECHO_TIMEOUT seconds without output.
+        :param command: The command, possibly spanning several lines
+        """
+        lines = to_text(command).strip().splitlines()
+        if not lines:
+            return
+
+        connection = self._connection
+        options = dict((name, connection.get_option(name))
+                       for name in ('terminal_stdout_re', 'terminal_stderr_re', 'persistent_command_timeout',
+                                    'persistent_buffer_read_timeout'))
+        connection.set_option('terminal_stdout_re', [{'pattern': re.escape(lines[-1].strip()[-64:])}])
+        connection.set_option('terminal_stderr_re', [{'pattern': '(?!)'}])
+        connection.set_option('persistent_command_timeout', ECHO_TIMEOUT)
+        # network_cli returns as soon as the echo is matched instead of
+        # reading on until the buffer has been quiet for a while
+        connection.set_option('persistent_buffer_read_timeout', 0)
+        try:
+            connection.receive(strip_prompt=False)
+        except (socket.timeout, AnsibleConnectionFailure):
+            connection.queue_message('vvvv', 'no echo of %r within %d seconds' % (lines[-1], ECHO_TIMEOUT))
+        finally:
+            for name, value in options.items():
+                connection.set_option(name, value)
+
+    def _command_timing(self, command, output, elapsed):
+        return {
+            'command': to_text(command, errors='surrogate_then_replace'),
+            'device_time': round(elapsed, 6),
+            'bytes': len(to_bytes(output or '', errors='surrogate_then_replace')),
+        }
+
+    def _log_elapsed(self, name, start):
+        self._connection.queue_message('vvvv', '%s completed in %.3f seconds' % (name, time.time() - start))
+
+    def _config_batches(self, lines, batch_size):
+        # Lines that expect a prompt are never batched
+        batch = []
+        for line in lines:
+            if len(line) > 1 or not batch_size or batch_size < 2:
+                if batch:
+                    yield batch
+                    batch = []
+                yield [line]
+                continue
+            batch.append(line)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _send_config_batch(self, commands):
+        """
+        Sends the configuration lines without waiting for the prompt between
+        them and splits the output into one response per line
+        :param commands: The configuration lines
+        :return: Returns the list of responses, or None when the output does not
+                 line up with the lines sent. An output that matches
+                 terminal_stderr_re raises AnsibleConnectionFailure.
+        """
+        # network_cli raises on the first error it sees in the output, which
+        # would leave the rest of the batch in the channel. Errors are checked
+        # per line once all prompts are read.
+        connection = self._connection
+        stderr_re = connection.get_option('terminal_stderr_re')
+        connection.set_option('terminal_stderr_re', [{'pattern': '(?!)'}])
+        try:
+            for cmd in commands:
+                connection.send(to_bytes(cmd), sendonly=True)
+            output = b''
+            while len(PROMPT_LINE_RE.findall(output)) < len(commands):
+                output += b'\n' + connection.receive(strip_prompt=False)
+        finally:
+            connection.set_option('terminal_stderr_re', stderr_re)
+
+        results = []
+        for cmd, response in zip(commands, PROMPT_LINE_RE.split(output)):
+            lines = response.strip().splitlines()
+            if not lines or lines[0].strip() != to_bytes(cmd).strip():
+                # The output does not line up with the lines sent
+                results = None
+                break
+            results.append(b'\n'.join(lines[1:]))
+
+        stderr_regexes = self._compile_stderr_re(stderr_re)
+        for response in results or [output]:
+            for regex in stderr_regexes:
+                if regex.search(b'\n%s\n' % response):
+                    raise AnsibleConnectionFailure(to_text(response, errors='surrogate_then_replace').strip())
+        if results is None:
+            return None
+        return [to_text(response, errors='surrogate_then_replace').strip() for response in results]
+
+    def _compile_stderr_re(self, stderr_re):
+        # The terminal_stderr_re option is compiled as network_cli does, and
+        # the regexes of the terminal plugin are used when it is not set
+        if not stderr_re:
+            return TerminalModule.terminal_stderr_re
+        regexes = []
+        for item in stderr_re:
+            flags = item.get('flags', 0)
+            if flags:
+                flags = getattr(re, flags.split('.')[1])
+            regexes.append(re.compile(to_bytes(item['pattern']), flags))
+        return regexes
+
+    def _invalidate_config_cache(self):
+        self._get_session_cache().pop('config', None)
+
+    def _get_session_cache(self):
+        # Values cached here only hold for the CLI session they were read from,
+        # so they are dropped whenever network_cli opens a new shell.
+        shell = getattr(self._connection, '_ssh_shell', None)
+        if getattr(self, '_session_shell', None) is not shell or not hasattr(self, '_session_cache'):
+            self._session_shell = shell
+            self._session_cache = {}
+        return self._session_cache
+
     def get_defaults_flag(self):
         """
         The method identifies the filter that should be used to fetch running-configuration
         with defaults.
         :return: valid default filter
         """
+        session = self._get_session_cache()
+        if 'defaults_flag' in session:
+            return session['defaults_flag']
+
+        path = self.get_option('defaults_flag_cache')
+        version = self.get_device_info().get('network_os_version') if path else None
+        flag = read_cache_file(path).get(version) if version else None
+        if flag:
+            session['defaults_flag'] = flag
+            return flag
+
         out = self.get('show config running ?')
         out = to_text(out, errors='surrogate_then_replace')
 
@@ -288,9 +638,18 @@ class Cliconf(CliconfBase):
                 commands.add(line.strip().split()[0])
 
         if 'all' in commands:
-            return 'all'
+            session['defaults_flag'] = 'all'
         else:
-            return 'full'
+            session['defaults_flag'] = 'full'
+
+        if version:
+            cache = read_cache_file(path)
+            cache[version] = session['defaults_flag']
+            try:
+                write_cache_file(path, cache)
+            except (IOError, OSError) as exc:
+                self._connection.queue_message('warning', 'Failed to write %s: %s' % (path, to_text(exc)))
+        return session['defaults_flag']
 
     def _extract_banners(self, config):
         banners = {}
@@ -24,4 +24,11 @@ class FactsArgs(object):
         'gather_subset': dict(
             default=['!config'], type='list', elements="str"
         ),
+        'tty': dict(type='str'),
+        'config_sections': dict(type='list', elements="str"),
+        'cache_dir': dict(type='path'),
+        'cache_ttl': dict(default=3600, type='int'),
+        'cache_refresh': dict(
+            default=[], type='list', elements="str"
+        ),
     }
@@ -15,6 +15,12 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 
+import os
+import time
+
+from functools import partial
+
+from ansible.module_utils._text import to_text
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.facts.facts import (
     FactsBase,
 )
@@ -23,6 +29,11 @@ from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.fact
     Tty,
     Config,
 )
+from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
+    get_capabilities,
+    read_cache_file,
+    write_cache_file,
+)
 
 
 FACT_LEGACY_SUBSETS = dict(
@@ -35,6 +46,35 @@ FACT_RESOURCE_SUBSETS = dict(
 )
 
 
+class CachedSubset(object):
+    """ A legacy facts subset served from the facts cache while it is fresh
+    """
+
+    def __init__(self, module, name, cache, refresh, cached_subset):
+        self.module = module
+        self.name = name
+        self.cache = cache
+        self.refresh = refresh
+        self.cached_subset = cached_subset
+        self.facts = dict()
+        self.warnings = list()
+        self._inst = FACT_LEGACY_SUBSETS[name](module)
+
+    def populate(self):
+        entry = self.cache.get(self.name)
+        now = time.time()
+        if (entry and not self.refresh and entry.get('key', '') == self._inst.cache_key()
+                and now - entry['timestamp'] < self.module.params['cache_ttl']):
+            self.facts = entry['facts']
+            self.cached_subset.append(self.name)
+            return
+
+        self._inst.populate()
+        self.facts = self._inst.facts
+        self.warnings = self._inst.warnings
+        self.cache[self.name] = dict(timestamp=now, key=self._inst.cache_key(), facts=self.facts)
+
+
 class Facts(FactsBase):
     """ The fact class for smartcs
     """
@@ -54,6 +94,55 @@ class Facts(FactsBase):
         """
 
         if self.VALID_LEGACY_GATHER_SUBSETS:
-            self.get_network_legacy_facts(FACT_LEGACY_SUBSETS, legacy_facts_type)
+            cache_path = self.get_cache_path()
+            if cache_path:
+                self.get_cached_legacy_facts(cache_path, legacy_facts_type)
+            else:
+                self.get_network_legacy_facts(FACT_LEGACY_SUBSETS, legacy_facts_type)
 
         return self.ansible_facts, self._warnings
+
+    def get_cache_path(self):
+        """ Returns the path of the facts cache of the device
+        :rtype: str
+        :return: the path, or None when the facts cache is not used
+        """
+        cache_dir = self._module.params.get('cache_dir')
+        if not cache_dir:
+            return None
+
+        serialnum = get_capabilities(self._module)['device_info'].get('network_os_serialnum')
+        if not serialnum:
+            self._warnings.append('unable to get the serial number, the facts cache is not used')
+            return None
+
+        return os.path.join(cache_dir, 'smartcs_facts_%s.json' % serialnum)
+
+    def get_cached_legacy_facts(self, cache_path, legacy_facts_type=None):
+        """ Collect the legacy facts, reusing the subsets found in the facts cache
+        :param cache_path: The path of the facts cache
+        :param legacy_facts_type: List of legacy facts types
+        """
+        cache = read_cache_file(cache_path)
+        cache_refresh = self._module.params['cache_refresh']
+        for name in cache_refresh:
+            if name != 'all' and name not in FACT_LEGACY_SUBSETS:
+                self._module.fail_json(
+                    msg='cache_refresh must be one of [all, %s], got %s'
+                    % (', '.join(sorted(FACT_LEGACY_SUBSETS)), name)
+                )
+        cached_subset = list()
+
+        fact_legacy_obj_map = dict(
+            (name, partial(CachedSubset, name=name, cache=cache,
+                           refresh=name in cache_refresh or 'all' in cache_refresh,
+                           cached_subset=cached_subset))
+            for name in FACT_LEGACY_SUBSETS
+        )
+        self.get_network_legacy_facts(fact_legacy_obj_map, legacy_facts_type)
+        self.ansible_facts['ansible_net_cached_subset'] = sorted(cached_subset)
+
+        try:
+            write_cache_file(cache_path, cache)
+        except (IOError, OSError) as exc:
+            self._warnings.append('unable to write the facts cache: %s' % to_text(exc))
@@ -17,14 +17,17 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 
+import hashlib
 import platform
 import re
 
 from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
     run_commands,
     get_capabilities,
+    change_hyphen_list_to_comma_list,
 )
 
+from ansible.module_utils._text import to_bytes
 from ansible.module_utils.six.moves import zip
 
 
@@ -44,69 +47,150 @@ class FactsBase(object):
     def run(self, cmd):
         return run_commands(self.module, commands=cmd, check_rc=False)
 
+    def cache_key(self):
+        """ Returns what, besides the device, the facts of the subset depend on """
+        return ''
+
+
+# (label, fact, value prefix) of the "label : value" lines of show version
+SHOW_VERSION_FIELDS = (
+    ('System', 'version', 'System Software Ver '),
+    ('Serial No.', 'serialnum', ''),
+    ('Model', 'model', ''),
+    ('Main System', 'mainsystem', 'Ver '),
+    ('Backup System', 'backupsystem', 'Ver '),
+    ('BootROM', 'bootrom', 'Ver '),
+    ('Boot Config', 'bootconfig', ''),
+)
+
+# (label, fact) of the "label : value" lines of show ip
+SHOW_IP_FIELDS = (
+    ('Hostname', 'hostname'),
+    ('IPaddress(eth1)', 'eth1'),
+    ('IPaddress(eth2)', 'eth2'),
+    ('IPaddress(bond1)', 'bond1'),
+)
+
+# The patterns start with the newline, so that the lines are located by a
+# fast literal search instead of trying the pattern at every position.
+IPINTERFACE_RE = re.compile(
+    r'\n[ \t]{0,8}(\S+)[ \t]+(?:up|down)[ \t]+[1-9]\d*[ \t]+(static|link)[ \t]+(.+)/(.+)'
+)
+IPINTERFACE_ADDR_RE = dict(
+    v6=re.compile(r'\n[ \t]+static[ \t]+(.+)/(.+)'),
+    v6_linklocal=re.compile(r'\n[ \t]+link[ \t]+(.+)/(.+)'),
+)
+
+
+def parse_fields(data, fields, empty=True):
+    """ Parses the "label : value" lines of data in a single pass
+    :param data: The output of the command
+    :param fields: Tuple of (label, fact, value prefix) or (label, fact)
+    :param empty: Whether an empty value is returned as is or as None
+    :rtype: dict
+    :return: the value of each fact, None when not found
+    """
+    table = dict((field[0], field[1:]) for field in fields)
+    facts = dict((field[1], None) for field in fields)
+    found = set()
+
+    fields_re = re.compile(
+        r'\n[ \t]*(%s)[ \t]+: (.*)' % '|'.join(re.escape(field[0]) for field in fields)
+    )
+    for match in fields_re.finditer('\n' + data):
+        label, value = match.group(1, 2)
+        if label in found:
+            continue
+        found.add(label)
+
+        fact = table[label]
+        prefix = fact[1] if len(fact) > 1 else ''
+        if value.startswith(prefix):
+            value = value[len(prefix):]
+            if value or empty:
+                facts[fact[0]] = value
+
+        if len(found) == len(table):
+            break
+
+    return facts
+
+
+def parse_ipinterface(data):
+    """ Parses the addresses of every interface of show ipinterface in a single pass
+    :param data: The output of show ipinterface
+    :rtype: dict
+    :return: the addresses of each interface
+    """
+    interfaces = dict()
+    data = '\n' + data
+    matches = list(IPINTERFACE_RE.finditer(data))
+
+    for index, match in enumerate(matches):
+        addrs = dict()
+        addrtype, ip, mask = match.group(2, 3, 4)
+        if addrtype == 'link':
+            addrs['v6_linklocal'] = (ip, mask)
+        elif '.' in ip:
+            addrs['v4'] = (ip, mask)
+        elif ':' in ip:
+            addrs['v6'] = (ip, mask)
+
+        # only the first address of each type below the interface is used
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(data)
+        for key, addr_re in IPINTERFACE_ADDR_RE.items():
+            if key not in addrs:
+                addr = addr_re.search(data, match.end(), end)
+                if addr:
+                    addrs[key] = addr.group(1, 2)
+
+        interfaces[match.group(1)] = dict(
+            v4_ip=addrs.get('v4', (None, None))[0],
+            v4_mask=addrs.get('v4', (None, None))[1],
+            v6_ip=addrs.get('v6', (None, None))[0],
+            v6_mask=addrs.get('v6', (None, None))[1],
+            v6_linklocal_ip=addrs.get('v6_linklocal', (None, None))[0],
+            v6_linklocal_mask=addrs.get('v6_linklocal', (None, None))[1]
+        )
+
+    return interfaces
+
 
 class Default(FactsBase):
 
     COMMANDS = [
         'show version',
         'show ip',
-        'show ipinterface bond1',
-        'show ipinterface eth1',
-        'show ipinterface eth2'
+        'show ipinterface'
     ]
 
     def populate(self):
         super(Default, self).populate()
         shver = self.responses[0]
         ship = self.responses[1]
-        shifb1 = self.responses[2]
-        shife1 = self.responses[3]
-        shife2 = self.responses[4]
+        shif = self.responses[2]
 
         if shver:
-            self.facts['version'] = self.parse_version(shver)
-            self.facts['serialnum'] = self.parse_serialnum(shver)
-            self.facts['model'] = self.parse_model(shver)
-            self.facts['mainsystem'] = self.parse_mainsystem(shver)
-            self.facts['backupsystem'] = self.parse_backupsystem(shver)
-            self.facts['bootrom'] = self.parse_bootrom(shver)
-            self.facts['bootconfig'] = self.parse_bootconfig(shver)
+            self.facts.update(parse_fields(shver, SHOW_VERSION_FIELDS))
 
         if ship:
-            self.facts['hostname'] = self.parse_hostname(ship)
-            self.facts['eth1'] = self.parse_eth1(ship)
-            self.facts['eth2'] = self.parse_eth2(ship)
-            self.facts['bond1'] = self.parse_bond1(ship)
-
-        if shifb1:
-            self.facts['bond1'] = dict(
-                v4_ip=self.parse_v4ip(shifb1),
-                v4_mask=self.parse_v4mask(shifb1),
-                v6_ip=self.parse_v6ip(shifb1),
-                v6_mask=self.parse_v6mask(shifb1),
-                v6_linklocal_ip=self.parse_v6llip(shifb1),
-                v6_linklocal_mask=self.parse_v6llmask(shifb1)
-            )
-
-        if shife1:
-            self.facts['eth1'] = dict(
-                v4_ip=self.parse_v4ip(shife1),
-                v4_mask=self.parse_v4mask(shife1),
-                v6_ip=self.parse_v6ip(shife1),
-                v6_mask=self.parse_v6mask(shife1),
-                v6_linklocal_ip=self.parse_v6llip(shife1),
-                v6_linklocal_mask=self.parse_v6llmask(shife1)
-            )
-
-        if shife2:
-            self.facts['eth2'] = dict(
-                v4_ip=self.parse_v4ip(shife2),
-                v4_mask=self.parse_v4mask(shife2),
-                v6_ip=self.parse_v6ip(shife2),
-                v6_mask=self.parse_v6mask(shife2),
-                v6_linklocal_ip=self.parse_v6llip(shife2),
-                v6_linklocal_mask=self.parse_v6llmask(shife2)
-            )
+            self.facts.update(parse_fields(ship, SHOW_IP_FIELDS, empty=False))
+
+        if shif:
+            interfaces = parse_ipinterface(shif)
+            self.facts['interfaces'] = interfaces
+
+            # bond1, eth1 and eth2 are also returned on their own as before,
+            # even when the device does not have them
+            for name in ('bond1', 'eth1', 'eth2'):
+                self.facts[name] = interfaces.get(name, dict(
+                    v4_ip=None,
+                    v4_mask=None,
+                    v6_ip=None,
+                    v6_mask=None,
+                    v6_linklocal_ip=None,
+                    v6_linklocal_mask=None
+                ))
 
     def platform_facts(self):
         platform_facts = {}
@@ -126,142 +210,107 @@ class Default(FactsBase):
 
         return platform_facts
 
-    def parse_version(self, data):
-        match = re.search(r'System                : System Software Ver (.*)', data)
-        if match:
-            return match.group(1)
 
-    def parse_serialnum(self, data):
-        match = re.search(r'Serial No.            : (.*)', data)
-        if match:
-            return match.group(1)
+class Config(FactsBase):
 
-    def parse_model(self, data):
-        match = re.search(r'Model                 : (.*)', data)
-        if match:
-            return match.group(1)
+    COMMANDS = [
+        'show config running all'
+    ]
 
-    def parse_mainsystem(self, data):
-        match = re.search(r'Main System           : Ver (.*)', data)
-        if match:
-            return match.group(1)
+    SECTIONS = (
+        'system',
+        'ether',
+        'bonding',
+        'ip',
+        'ip6',
+        'user',
+        'ipinterface',
+        'ip host',
+        'ip route',
+        'ip6route',
+        'ipfilter',
+        'ipsec',
+        'dns',
+        'syslog',
+        'sntp',
+        'nfs',
+        'auth',
+        'acct',
+        'portd',
+        'tty',
+        'logd',
+        'console',
+        'temperature',
+        'snmp',
+        'service',
+        'maintenance',
+        'terminal',
+    )
 
-    def parse_backupsystem(self, data):
-        match = re.search(r'Backup System         : Ver (.*)', data)
-        if match:
-            return match.group(1)
+    def __init__(self, module):
+        super(Config, self).__init__(module)
+        self.sections = module.params.get('config_sections') or []
+        for section in self.sections:
+            if section not in self.SECTIONS:
+                module.fail_json(
+                    msg='config_sections must be one of [%s], got %s'
+                    % (', '.join(self.SECTIONS), section)
+                )
 
-    def parse_bootrom(self, data):
-        match = re.search(r'BootROM               : Ver (.*)', data)
-        if match:
-            return match.group(1)
+    def cache_key(self):
+        return ','.join(self.sections)
 
-    def parse_bootconfig(self, data):
-        match = re.search(r'Boot Config           : (.*)', data)
-        if match:
-            return match.group(1)
+    def populate(self):
+        if self.sections:
+            self.populate_sections()
+            return
 
-    def parse_hostname(self, data):
-        match = re.search(r'Hostname         : (.+)', data)
-        if match:
-            return match.group(1)
+        super(Config, self).populate()
+        data = self.responses[0]
+        if data:
+            self.facts['config'] = data
 
-    def parse_eth1(self, data):
-        match = re.search(r'IPaddress\(eth1\)  : (.+)', data)
-        if match:
-            return match.group(1)
+    def populate_sections(self):
+        self.responses = self.run(['show config running %s' % section for section in self.sections])
+        sections = dict()
+        digests = dict()
+        for section, data in zip(self.sections, self.responses):
+            sections[section] = data
+            digests[section] = hashlib.sha256(to_bytes(data, errors='surrogate_or_strict')).hexdigest()
 
-    def parse_eth2(self, data):
-        match = re.search(r'IPaddress\(eth2\)  : (.+)', data)
-        if match:
-            return match.group(1)
+        self.facts['config_sections'] = sections
+        self.facts['config_digests'] = digests
 
-    def parse_bond1(self, data):
-        match = re.search(r'IPaddress\(bond1\) : (.+)', data)
-        if match:
-            return match.group(1)
-
-    def parse_v4ip(self, data):
-        match = re.search(r' (bond1|eth1|eth2)(.*)(up|down)(.*)([1-9].+)(.*)static  (.*)/(.*)', data)
-        if match and '.' in match.group(7):
-            return match.group(7)
-
-    def parse_v4mask(self, data):
-        match = re.search(r' (bond1|eth1|eth2)(.*)(up|down)(.*)([1-9].+)(.*)static  (.*)/(.*)', data)
-        if match and '.' in match.group(7):
-            return match.group(8)
-
-    def parse_v6ip(self, data):
-        match1 = re.search(r' (bond1|eth1|eth2)(.*)(up|down)(.*)([1-9].+)(.*)static  (.*)/(.*)', data)
-        match2 = re.search(r'                    static  (.+)/(.+)', data)
-        if match1 and ':' in match1.group(7):
-            return match1.group(7)
-        if match2:
-            return match2.group(1)
-
-    def parse_v6mask(self, data):
-        match1 = re.search(r' (bond1|eth1|eth2)(.*)(up|down)(.*)([1-9].+)(.*)static  (.*)/(.*)', data)
-        match2 = re.search(r'                    static  (.+)/(.+)', data)
-        if match1 and ':' in match1.group(7):
-            return match1.group(8)
-        if match2:
-            return match2.group(2)
-
-    def parse_v6llip(self, data):
-        match1 = re.search(r' (bond1|eth1|eth2)(.*)(up|down)(.*)([1-9].+)(.*)link    (.*)/(.*)', data)
-        match2 = re.search(r'                    link    (.+)/(.+)', data)
-        if match1:
-            return match1.group(7)
-        if match2:
-            return match2.group(1)
-
-    def parse_v6llmask(self, data):
-        match1 = re.search(r' (bond1|eth1|eth2)(.*)(up|down)(.*)([1-9].+)(.*)link    (.*)/(.*)', data)
-        match2 = re.search(r'                    link    (.+)/(.+)', data)
-        if match1:
-            return match1.group(8)
-        if match2:
-            return match2.group(2)
 
+PORTD_TTY_RE = re.compile(
+    r'(\d+)\s+(.+)\s+(\d)\s+(\d)\s+(both|tel|ssh)\s+(both|rw|ro)\s+(ssh|-)\s+(on|off)\s+(.+)\s+(cr|lf|crlf)\s+(.+)\s+(cr|lf|crlf|-)'
+)
+TTY_RE = re.compile(
+    r'(\d+)\s+(.+)\s+(\d)\s+(none|even|odd)\s+(1|2)\s+(none|rts|xon)\s+(on|off)'
+)
 
-class Config(FactsBase):
 
-    COMMANDS = [
-        'show config running all'
-        # 'show config running system',
-        # 'show config running ether',
-        # 'show config running bonding',
-        # 'show config running ip',
-        # 'show config running ip6',
-        # 'show config running user',
-        # 'show config running ipinterface',
-        # 'show config running ip host',
-        # 'show config running ip route',
-        # 'show config running ip6route',
-        # 'show config running ipfilter',
-        # 'show config running ipsec',
-        # 'show config running dns',
-        # 'show config running syslog',
-        # 'show config running sntp',
-        # 'show config running nfs',
-        # 'show config running auth',
-        # 'show config running acct',
-        # 'show config running portd',
-        # 'show config running tty',
-        # 'show config running logd',
-        # 'show config running console',
-        # 'show config running temperature',
-        # 'show config running snmp',
-        # 'show config running service',
-        # 'show config running maintenance',
-        # 'show config running terminal',
-    ]
+def parse_tty_table(data, table_re, ttys=None):
+    """ Indexes the lines of a tty table by tty number
+    :param data: The output of the command
+    :param table_re: The pattern of a line of the table
+    :param ttys: The ttys to parse, all the ttys when None
+    :rtype: dict
+    :return: the match of each tty
+    """
+    table = dict()
+    for line in data.split('\n'):
+        tokens = line.split(None, 1)
+        if not tokens or not tokens[0].isdigit():
+            continue
+        if ttys is not None and int(tokens[0]) not in ttys:
+            continue
+
+        match = table_re.search(line)
+        if match:
+            table.setdefault(int(match.group(1)), match)
 
-    def populate(self):
-        super(Config, self).populate()
-        data = self.responses[0]
-        if data:
-            self.facts['config'] = data
+    return table
 
 
 class Tty(FactsBase):
@@ -271,33 +320,48 @@ class Tty(FactsBase):
         'show tty'
     ]
 
+    def __init__(self, module):
+        super(Tty, self).__init__(module)
+        self.ttys = None
+        if module.params.get('tty'):
+            try:
+                self.ttys = set(change_hyphen_list_to_comma_list(module.params['tty']))
+            except ValueError:
+                module.fail_json(msg='tty parameter is invalid. input value is an integer from 1 to 48')
+
+    def cache_key(self):
+        return self.module.params.get('tty') or ''
+
     def populate(self):
         super(Tty, self).populate()
 
-        shportd = "\n" + self.responses[0]
-        shtty = self.responses[1]
+        portd = parse_tty_table(self.responses[0], PORTD_TTY_RE, self.ttys)
+        tty = parse_tty_table(self.responses[1], TTY_RE, self.ttys)
         entries = []
 
-        for shportd_line, shtty_line in zip(shportd.split('\n'), shtty.split('\n')):
-            portd_match = re.search(
-                r'(\d+)\s+(.+)\s+(\d)\s+(\d)\s+(both|tel|ssh)\s+(both|rw|ro)\s+(ssh|-)\s+(on|off)\s+(.+)\s+(cr|lf|crlf)\s+(.+)\s+(cr|lf|crlf|-)',
-                shportd_line
-            )
-            tty_match = re.search(
-                r'(\d+)\s+(.+)\s+(\d)\s+(none|even|odd)\s+(1|2)\s+(none|rts|xon)\s+(on|off)',
-                shtty_line
-            )
-            if portd_match and tty_match:
-                entry = dict(
-                    tty=int(tty_match.group(1)),
-                    label=portd_match.group(2).strip(),
-                    baud=int(tty_match.group(2)),
-                    bitchar=int(tty_match.group(3)),
-                    parity=tty_match.group(4),
-                    stop=int(tty_match.group(5)),
-                    flow=tty_match.group(6),
-                )
-                if entry:
-                    entries.append(entry)
+        for ttynum in sorted(tty):
+            if ttynum not in portd:
+                continue
+            portd_match = portd[ttynum]
+            tty_match = tty[ttynum]
+            entries.append(dict(
+                tty=ttynum,
+                label=portd_match.group(2).strip(),
+                baud=int(tty_match.group(2)),
+                bitchar=int(tty_match.group(3)),
+                parity=tty_match.group(4),
+                stop=int(tty_match.group(5)),
+                flow=tty_match.group(6),
+                rw_sessions=int(portd_match.group(3)),
+                ro_sessions=int(portd_match.group(4)),
+                mode=portd_match.group(5),
+                rw=portd_match.group(6),
+                auth=portd_match.group(7),
+                timestamp=portd_match.group(8),
+                timestamp_format=portd_match.group(9).strip(),
+                send_nl=portd_match.group(10),
+                recv_nl_mode=portd_match.group(11).strip(),
+                recv_nl=portd_match.group(12),
+            ))
 
         self.facts['tty'] = entries
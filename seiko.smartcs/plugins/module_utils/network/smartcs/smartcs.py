@@ -31,12 +31,17 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import hashlib
 import json
 import re
 import os
+import time
 
-from ansible.module_utils._text import to_text
+from ansible.module_utils._text import to_bytes, to_text
 from ansible.module_utils.basic import env_fallback
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.config import (
+    ignore_line,
+)
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import (
     to_list, ComplexList,
 )
@@ -85,18 +90,24 @@ def get_connection(module):
     capabilities = get_capabilities(module)
     network_api = capabilities.get('network_api')
     if network_api == 'cliconf':
-        module._smartcs_connection = Connection(module._socket_path)
+        module._smartcs_connection = _get_socket_connection(module)
     else:
         module.fail_json(msg='Invalid connection type %s' % network_api)
 
     return module._smartcs_connection
 
 
+def _get_socket_connection(module):
+    if not hasattr(module, '_smartcs_socket_connection'):
+        module._smartcs_socket_connection = Connection(module._socket_path)
+    return module._smartcs_socket_connection
+
+
 def get_capabilities(module):
     if hasattr(module, '_smartcs_capabilities'):
         return module._smartcs_capabilities
     try:
-        capabilities = Connection(module._socket_path).get_capabilities()
+        capabilities = _get_socket_connection(module).get_capabilities()
     except ConnectionError as exc:
         module.fail_json(msg=to_text(exc, errors='surrogate_then_replace'))
     module._smartcs_capabilities = json.loads(capabilities)
@@ -145,12 +156,66 @@ def to_commands(module, commands):
     return transform(commands)
 
 
-def run_commands(module, commands, check_rc=True):
+def run_commands(module, commands, check_rc=True, timings=None):
     connection = get_connection(module)
+    start = time.time()
     try:
-        return connection.run_commands(commands=commands, check_rc=check_rc)
+        out = connection.run_commands(commands=commands, check_rc=check_rc, timings=timings is not None)
     except ConnectionError as exc:
         module.fail_json(msg=to_text(exc))
+    if timings is None:
+        return out
+    timings.extend(add_ipc_time(out['timings'], time.time() - start))
+    return out['responses']
+
+
+def add_ipc_time(timings, elapsed, tty=None):
+    """ Adds the share of a request not spent on the device to the timings
+    of its commands
+    """
+    if timings:
+        ipc_time = max(elapsed - sum(item['device_time'] for item in timings), 0) / len(timings)
+        for item in timings:
+            item['ipc_time'] = round(ipc_time, 6)
+            if tty is not None:
+                item['tty'] = tty
+    return timings
+
+
+def run_tty_script(module, settings=None, ttys=None, check_rc=True, timings=None):
+    connection = get_connection(module)
+    start = time.time()
+    try:
+        script = connection.run_tty_script(settings=settings, ttys=ttys, check_rc=check_rc,
+                                           timings=timings is not None)
+    except ConnectionError as exc:
+        module.fail_json(msg=to_text(exc))
+    if timings is not None:
+        # The overhead of the request is spread over every command it carried
+        elapsed = time.time() - start
+        script_timings = script.pop('timings')
+        for item in script['ttys']:
+            for timing in item['timings']:
+                timing['tty'] = item['tty']
+            script_timings.extend(item.pop('timings'))
+        timings.extend(add_ipc_time(script_timings, elapsed))
+    return script
+
+
+def run_tty_script_per_tty(module, ttys, check_rc=True, callback=None, timings=None):
+    connection = get_connection(module)
+    items = list()
+    for tty in ttys:
+        start = time.time()
+        try:
+            item = connection.run_tty_script(ttys=[tty], check_rc=check_rc,
+                                             timings=timings is not None)['ttys'][0]
+            if timings is not None:
+                timings.extend(add_ipc_time(item.pop('timings'), time.time() - start, item['tty']))
+            items.append(callback(item) if callback else item)
+        except (ConnectionError, EnvironmentError) as exc:
+            module.fail_json(msg=to_text(exc))
+    return items
 
 
 def load_config(module, commands):
@@ -213,6 +278,37 @@ def handle_template(self):
     self._task.args['src'] = self._templar.template(template_data)
 
 
+def handle_working_path(self, option):
+    path = os.path.expanduser(self._task.args.get(option))
+    if not os.path.isabs(path):
+        path = os.path.join(self._get_working_path(), path)
+    self._task.args[option] = path
+
+
+def read_cache_file(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def write_cache_file(path, data):
+    # The cache is written to a temporary file and renamed, so a reader
+    # never sees a partially written file. It can hold the running config
+    # with the password hashes, so only the owner may read it.
+    dirname = os.path.dirname(path)
+    if dirname and not os.path.isdir(dirname):
+        os.makedirs(dirname)
+    tmp_path = '%s.%d' % (path, os.getpid())
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f)
+    os.rename(tmp_path, path)
+
+
 def flatten(array):
     res = []
     for el in array:
@@ -223,12 +319,83 @@ def flatten(array):
     return res
 
 
+def iter_config_lines(config):
+    """ Yields the lines of a configuration kept by NetworkConfig, as they are
+    """
+    for line in to_text(config, errors='surrogate_or_strict').split('\n'):
+        text = re.sub(r'([{};])', '', line).strip()
+        if text and not ignore_line(text):
+            yield line
+
+
+def flat_config_lines(config):
+    """ Returns the lines of a configuration the way NetworkConfig reads them,
+    or None when a line is indented and the configuration is not flat
+    """
+    lines = list()
+    for line in iter_config_lines(config):
+        if line[0].isspace():
+            return None
+        lines.append(line.strip())
+    return lines
+
+
+def diff_flat_config(candidate, running=None):
+    """ Returns the candidate lines missing in running, as NetworkConfig.difference
+    with match=line does, in linear time through a hash set of the running lines
+    :param candidate: The candidate configuration
+    :param running: The running configuration, None to return every candidate line
+    :return: the list of lines, or None when a configuration is not flat
+    """
+    want = flat_config_lines(candidate)
+    if want is None or running is None:
+        return want
+
+    have = flat_config_lines(running)
+    if have is None:
+        return None
+
+    have = set(have)
+    return [line for line in want if line not in have]
+
+
+COMPAREBLE_CONFIG_RE = {
+    'running': re.compile(r'^[.]+'),
+    'startup': re.compile(r'^=== show (external|internal) startup(1|2|3|4) ==='),
+}
+
+
 def compareble_config(running_config, startup_config):
-    running_config_compareble = re.sub(r'^[.]+', "", str(running_config))
-    startup_config_compareble = re.sub(r'^=== show (external|internal) startup(1|2|3|4) ===', "", str(startup_config))
+    running_config_compareble = COMPAREBLE_CONFIG_RE['running'].sub("", str(running_config))
+    startup_config_compareble = COMPAREBLE_CONFIG_RE['startup'].sub("", str(startup_config))
     return running_config_compareble, startup_config_compareble
 
 
+def config_digest(config, source='running'):
+    """ Returns the SHA-256 digest of the configuration normalized the way
+    NetworkConfig and compareble_config do, one line at a time
+    :param config: The output of show config running or show config startup
+    :param source: The source of the configuration, running or startup
+    :return: the hex digest
+    """
+    digest = hashlib.sha256()
+    for index, line in enumerate(iter_config_lines(config)):
+        if index == 0:
+            line = COMPAREBLE_CONFIG_RE[source].sub("", line)
+        else:
+            digest.update(b'\n')
+        digest.update(to_bytes(line, errors='surrogate_or_strict'))
+    return digest.hexdigest()
+
+
+def get_config_digest(module, source='running'):
+    connection = get_connection(module)
+    try:
+        return connection.get_config_digest(source=source)
+    except ConnectionError as exc:
+        module.fail_json(msg=to_text(exc, errors='surrogate_then_replace'))
+
+
 def cli_ttysendwaitset_in(ttynum, timeout, nl, cmd):
     return ttysend_input(('ttysendwaitset tty ' + str(ttynum) + ' timeout '
                          + str(timeout) + ' nl ' + nl + ' input'), cmd)
@@ -336,6 +503,15 @@ NOWAITSEC = "__NOWAIT__:"
 CTLCHAR = "__CTL__:"
 HEXSTR = "__HEX__:"
 
+# waitregex used for the initial_prompt with early_completion
+EARLY_COMPLETION_INDEX = 8
+# Number of waitstr, waitregex and errorregex entries of ttymanage
+WAITSTR_MAX = 16
+WAITREGEX_MAX = 8
+ERRORREGEX_MAX = 8
+# Timeout of a ttysendwaitset sent in place of a delay
+WAIT_TIMEOUT_RE = re.compile(r'(?:\s*\n|^)Error:: Timeout[^\r\n]*')
+
 ctlchar_list = ['00', '01', '02', '03', '04', '05', '06', '07',
                 '08', '09', '0a', '0b', '0c', '0d', '0e', '0f',
                 '10', '11', '12', '13', '14', '15', '16', '17',
@@ -436,13 +612,9 @@ def pre_check(module):
         return False
 
 
-def pre_action(module):
-    tty = module.params['tty']
-    nl = module.params['nl']
+def _prepare_pre_action(module, timings=None):
     initial_prompt = module.params['initial_prompt']
-    initial_cmd = module.params['initial_prompt_check_cmd']
     initial_cmd_timeout = module.params['initial_prompt_check_cmd_timeout']
-    escape_cmd = module.params['escape_cmd']
     escape_cmd_timeout = module.params['escape_cmd_timeout']
     escape_cmd_retry = module.params['escape_cmd_retry']
 
@@ -450,49 +622,119 @@ def pre_action(module):
     num_range_check(module, 'escape_cmd_timeout', escape_cmd_timeout, 1, 30)
     num_range_check(module, 'escape_cmd_retry', escape_cmd_retry, 0, 8)
 
+    if module.params.get('early_completion'):
+        # The sends return as soon as the initial prompt is received, so it is
+        # registered as a waitregex before the first one. The entries left by
+        # earlier tasks would end them too, so they are cleared first. It goes
+        # through the ttymanage settings so the session cache knows about it,
+        # and only the entries that are set are cleared.
+        settings = [terminal_ttymanage_waitstr_input(index, '') for index in range(1, WAITSTR_MAX + 1)]
+        settings.extend(terminal_ttymanage_waitregex_input(index, '') for index in range(1, WAITREGEX_MAX + 1)
+                        if index != EARLY_COMPLETION_INDEX)
+        settings.extend(terminal_ttymanage_errregex_input(index, '') for index in range(1, ERRORREGEX_MAX + 1))
+        settings.append(terminal_ttymanage_waitregex_input(EARLY_COMPLETION_INDEX, initial_prompt.strip()))
+        run_tty_script(module, settings=settings, timings=timings)
+
+
+def _finish_pre_action(module, timings=None):
+    if module.params.get('early_completion'):
+        # An empty input clears the waitregex registered for the pre-check, so
+        # it does not end the sends of sendchar or of the following tasks.
+        run_tty_script(module, settings=[terminal_ttymanage_waitregex_input(
+            EARLY_COMPLETION_INDEX, '')], timings=timings)
+
+
+def _pre_check_tty(module, tty, run):
+    """ Sends the initial and escape commands to tty with run until the initial
+    prompt is received
+    :returns: the responses and, when the prompt was not received, the reason
+    """
+    nl = module.params['nl']
+    initial_prompt = module.params['initial_prompt']
+    initial_cmd = module.params['initial_prompt_check_cmd']
+    initial_cmd_timeout = module.params['initial_prompt_check_cmd_timeout']
+    escape_cmd = module.params['escape_cmd']
+    escape_cmd_timeout = module.params['escape_cmd_timeout']
+    escape_cmd_retry = module.params['escape_cmd_retry']
+
+    if module.params.get('early_completion'):
+        get_clicmd = get_clicmd_ttysend_early
+    else:
+        get_clicmd = get_clicmd_ttysend_delay
+
     initial_command = list()
-    initial_command.append(get_clicmd_ttysend_delay
-                           (module, tty, nl, initial_cmd, initial_cmd_timeout))
+    initial_command.append(get_clicmd(module, tty, nl, initial_cmd, initial_cmd_timeout))
 
     pre_response = list()
-    pre_response.append(remove_sendstr(run_commands(module, initial_command)))
+    pre_response.append(remove_wait_timeout(remove_sendstr(run(initial_command))))
 
     if contain_initprompt(module, initial_prompt, pre_response):
-        return flatten(pre_response)
+        return flatten(pre_response), None
 
     if escape_cmd is None:
-        module.fail_json(
-            msg='pre_check failed. \'%s\' was not detect. : %s'
+        return pre_response, (
+            'pre_check failed. \'%s\' was not detect. : %s'
             % (initial_prompt, pre_response)
         )
 
     for i in range(escape_cmd_retry + 1):
         escape_command = list()
         escape_command.append(
-            get_clicmd_ttysend_delay(module, tty, nl, escape_cmd, escape_cmd_timeout)
+            get_clicmd(module, tty, nl, escape_cmd, escape_cmd_timeout)
         )
-        pre_response.append(remove_sendstr(run_commands(module, escape_command)))
+        pre_response.append(remove_wait_timeout(remove_sendstr(run(escape_command))))
         if contain_initprompt(module, initial_prompt, pre_response):
             break
 
-        pre_response.append(remove_sendstr(run_commands(module, initial_command)))
+        pre_response.append(remove_wait_timeout(remove_sendstr(run(initial_command))))
         if contain_initprompt(module, initial_prompt, pre_response):
             break
 
         if escape_cmd_retry == 0:
-            module.fail_json(
-                msg='pre_check failed. \'%s\' was not detected \
+            return pre_response, (
+                'pre_check failed. \'%s\' was not detected \
                 after sending initial_prompt_check_cmd. : %s'
                 % (initial_prompt, pre_response)
             )
         elif i == escape_cmd_retry:
-            module.fail_json(
-                msg='pre_check failed(retry limit:%d). \'%s\' was not detected \
+            return pre_response, (
+                'pre_check failed(retry limit:%d). \'%s\' was not detected \
                 after sending initial_prompt_check_cmd. : %s'
                 % (escape_cmd_retry, initial_prompt, pre_response)
             )
 
-    return flatten(pre_response)
+    return flatten(pre_response), None
+
+
+def pre_action(module, timings=None):
+    _prepare_pre_action(module, timings)
+    pre_response, msg = _pre_check_tty(module, module.params['tty'],
+                                       lambda commands: run_commands(module, commands, timings=timings))
+    _finish_pre_action(module, timings)
+    if msg:
+        module.fail_json(msg=msg)
+    return pre_response
+
+
+def pre_action_per_tty(module, ttys, timings=None):
+    """ Runs the pre-check on each tty on its own
+    :returns: a list of dicts with the tty, whether the initial prompt was
+              received (ready), the responses and the reason of a failure (msg),
+              in the order of ttys
+    """
+    _prepare_pre_action(module, timings)
+    items = list()
+    for tty in ttys:
+        tty_timings = None if timings is None else list()
+        pre_response, msg = _pre_check_tty(module, tty,
+                                           lambda commands: run_commands(module, commands, timings=tty_timings))
+        if timings is not None:
+            for timing in tty_timings:
+                timing['tty'] = tty
+            timings.extend(tty_timings)
+        items.append(dict(tty=tty, ready=msg is None, responses=flatten(pre_response), msg=msg))
+    _finish_pre_action(module, timings)
+    return items
 
 
 def comma_and_hyphen_to_comma(s):
@@ -548,6 +790,37 @@ def check_return_error(module, responses):
             )
 
 
+def find_return_errors(responses):
+    resp_list = flatten(list(to_lines(responses)))
+    r_other = re.compile("(^|\r|\n)Error::")
+    return [i for i in resp_list if r_other.match(i)]
+
+
+def check_output_error(module, output_files):
+    if module.params['error_detect_on_module'] == "ok":
+        return
+    else:
+        output_paths = [f['path'] for f in output_files]
+        errors = flatten([f['errors'] for f in output_files])
+
+        # check error_recvchar_regex error
+        if module.params['error_recvchar_regex']:
+            r = re.compile("(^|\r|\n)Error:: Matched")
+            errrecv_match_result = [i for i in errors if r.match(i)]
+            if errrecv_match_result:
+                module.fail_json(
+                    msg='error_recvchar_regex matched %s, output_files: %s' %
+                    (errrecv_match_result, output_paths)
+                )
+
+        # check other errors
+        if errors:
+            module.fail_json(
+                msg='Error detect %s, output_files: %s' %
+                (errors, output_paths)
+            )
+
+
 def get_clicmd_ttysend_waitset(module, tty, nl, cmd, cmd_timeout):
     # WAIT__:sec of NO OPTION
     if NEWLINE in cmd:
@@ -573,6 +846,14 @@ def get_clicmd_ttysend_delay(module, tty, nl, cmd, cmd_timeout):
         return cli_ttysend_delay_in(tty, cmd_timeout, nl, cmd)
 
 
+def get_clicmd_ttysend_early(module, tty, nl, cmd, cmd_timeout):
+    # __NOWAIT__:sec with early_completion
+    # ttysendwaitset has no hex form, so a hex string is still sent with a delay.
+    if HEXSTR in cmd:
+        return get_clicmd_ttysend_delay(module, tty, nl, cmd, cmd_timeout)
+    return get_clicmd_ttysend_waitset(module, tty, nl, cmd, cmd_timeout)
+
+
 def get_clicmd_ttysend(module, tty, nl, cmd):
     # __NOWAIT__
     if NEWLINE in cmd:
@@ -592,31 +873,40 @@ def remove_sendstr(response):
     return [re.sub('sendstr> .*\n', '', s) for s in response]
 
 
-def edit_responses(module, responses):
-    # nl, cmd_timeout, cmd_timeout_onfail
-    paramlen_grp1 = 3
+def remove_wait_timeout(response):
+    return [WAIT_TIMEOUT_RE.sub('', s) for s in response]
+
+
+def edit_responses(module, responses, settings_len=None):
+    # The settings responses can be fewer than the settings when the cliconf
+    # plugin skips those already applied on the session, so the caller may
+    # give the number actually returned.
+    if settings_len is None:
+        # nl, cmd_timeout, cmd_timeout_onfail
+        paramlen_grp1 = 3
+
+        # recvchar
+        paramlen_recvchar = \
+            len(module.params['recvchar']) if (module.params['recvchar']) else 0
 
-    # recvchar
-    paramlen_recvchar = \
-        len(module.params['recvchar']) if (module.params['recvchar']) else 0
+        # recvchar_regex
+        paramlen_recvchar_regex = \
+            len(module.params['recvchar_regex']) if (module.params['recvchar_regex']) else 0
 
-    # recvchar_regex
-    paramlen_recvchar_regex = \
-        len(module.params['recvchar_regex']) if (module.params['recvchar_regex']) else 0
+        # error_recvchar_regex
+        paramlen_error_recvchar_regex = \
+            len(module.params['error_recvchar_regex']) if (module.params['error_recvchar_regex']) else 0
 
-    # error_recvchar_regex
-    paramlen_error_recvchar_regex = \
-        len(module.params['error_recvchar_regex']) if (module.params['error_recvchar_regex']) else 0
+        settings_len = (paramlen_grp1
+                        + paramlen_recvchar
+                        + paramlen_recvchar_regex
+                        + paramlen_error_recvchar_regex
+                        )
 
     # tty
     paramlen_grp2 = 1
 
-    del_idx = (paramlen_grp1
-               + paramlen_recvchar
-               + paramlen_recvchar_regex
-               + paramlen_error_recvchar_regex
-               + paramlen_grp2
-               )
+    del_idx = settings_len + paramlen_grp2
 
     del responses[0:(del_idx)]
 
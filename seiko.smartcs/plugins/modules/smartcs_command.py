@@ -91,6 +91,46 @@ options:
       trying the command again.
     default: 1
     type: int
+  backoff:
+    description:
+    - Multiplies the interval by this factor after every retry, so long waits
+      poll the device less and less often. When 1 is set, the interval is fixed.
+    default: 1
+    type: float
+    version_added: "1.8.0"
+  max_interval:
+    description:
+    - Caps the interval in seconds between retries that grows with I(backoff).
+    type: int
+    version_added: "1.8.0"
+  deadline:
+    description:
+    - Specifies the time in seconds after which no more retries are made,
+      whether or not I(retries) is exhausted.
+    type: int
+    version_added: "1.8.0"
+  rerun:
+    description:
+    - Specifies the commands that are run again from the second try.
+      If the value is set to C(all), every command is run on each try.
+      If the value is set to C(conditional), only the commands whose
+      results are referenced by the I(wait_for) conditions that are not
+      yet satisfied are run again, and the other results in stdout are
+      those of an earlier try.
+    default: all
+    type: str
+    choices:
+    - all
+    - conditional
+    version_added: "1.8.0"
+  command_timings:
+    description:
+    - Returns the time each command took in command_timings.
+    - The device_time of a command is measured on the persistent connection, and the
+      ipc_time is its share of the rest of the time of the request that carried it.
+    default: false
+    type: bool
+    version_added: "1.8.0"
 """
 
 EXAMPLES = """
@@ -118,6 +158,22 @@ EXAMPLES = """
       - result[0] contains NS-2250
       - result[1] contains lo
 
+- name: wait up to 10 minutes for the device on tty 1 to boot, polling less and less often
+  seiko.smartcs.smartcs_command:
+    commands:
+      - show version
+      - command: 'ttysendwaitset tty 1 timeout 5 nl cr input'
+        prompt: 'sendstr> '
+        answer: ''
+    wait_for:
+      - result[1] contains login
+    rerun: conditional
+    retries: 100
+    interval: 2
+    backoff: 1.5
+    max_interval: 30
+    deadline: 600
+
 - name: run commands that require answering a prompt
   seiko.smartcs.smartcs_command:
     commands:
@@ -145,7 +201,14 @@ failed_conditions:
   returned: failed
   type: list
   sample: ['...', '...']
+command_timings:
+  description: The timings of the commands sent to the device, in the order they were sent
+  returned: when command_timings is true
+  type: list
+  elements: dict
+  sample: [{"command": "show version", "device_time": 0.112, "ipc_time": 0.004, "bytes": 412}]
 """
+import re
 import time
 
 from ansible.module_utils.basic import AnsibleModule
@@ -183,6 +246,19 @@ def parse_commands(module, warnings):
     return items
 
 
+def conditional_commands(conditionals, commands):
+    """ Returns the indexes of the commands whose results the conditionals
+    reference, or of every command when one of them references no single result
+    """
+    indexes = set()
+    for item in conditionals:
+        match = re.match(r'result\[(\d+)\]', item.key)
+        if not match or int(match.group(1)) >= len(commands):
+            return list(range(len(commands)))
+        indexes.add(int(match.group(1)))
+    return sorted(indexes)
+
+
 def main():
     """main entry point for module execution
     """
@@ -191,7 +267,12 @@ def main():
         wait_for=dict(type='list', elements="str", aliases=['waitfor']),
         match=dict(default='all', choices=['all', 'any']),
         retries=dict(default=10, type='int'),
-        interval=dict(default=1, type='int')
+        interval=dict(default=1, type='int'),
+        backoff=dict(default=1, type='float'),
+        max_interval=dict(type='int'),
+        deadline=dict(type='int'),
+        rerun=dict(default='all', choices=['all', 'conditional']),
+        command_timings=dict(default=False, type='bool')
     )
 
     argument_spec.update(smartcs_argument_spec)
@@ -211,10 +292,21 @@ def main():
 
     retries = module.params['retries']
     interval = module.params['interval']
+    backoff = module.params['backoff']
+    max_interval = module.params['max_interval']
     match = module.params['match']
+    timings = list() if module.params['command_timings'] else None
+
+    deadline = None
+    if module.params['deadline'] is not None:
+        deadline = time.time() + module.params['deadline']
 
+    indexes = list(range(len(commands)))
+    responses = [None] * len(commands)
     while retries > 0:
-        responses = run_commands(module, commands)
+        out = run_commands(module, [commands[index] for index in indexes], timings=timings)
+        for index, response in zip(indexes, out):
+            responses[index] = response
 
         for item in list(conditionals):
             if item(responses):
@@ -226,8 +318,20 @@ def main():
         if not conditionals:
             break
 
-        time.sleep(interval)
         retries -= 1
+        if not retries:
+            break
+
+        delay = interval if max_interval is None else min(interval, max_interval)
+        if deadline is not None:
+            if time.time() + delay > deadline:
+                break
+        time.sleep(delay)
+        interval *= backoff
+
+        if module.params['rerun'] == 'conditional':
+            # Only the results the remaining conditionals look at are fetched again
+            indexes = conditional_commands(conditionals, commands)
 
     if conditionals:
         failed_conditions = [item.raw for item in conditionals]
@@ -239,6 +343,8 @@ def main():
         'stdout': responses,
         'stdout_lines': list(to_lines(responses))
     })
+    if timings is not None:
+        result['command_timings'] = timings
 
     module.exit_json(**result)
 
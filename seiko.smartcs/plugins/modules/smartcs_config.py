@@ -92,6 +92,15 @@ options:
     - modified
     - changed
     type: str
+  command_timings:
+    description:
+    - Returns the time each command took in command_timings.
+    - The device_time of a command is measured on the persistent connection, and the
+      ipc_time is its share of the rest of the time of the request that carried it.
+      The lines sent in one batch share the time of the batch.
+    default: false
+    type: bool
+    version_added: "1.8.0"
 """
 
 EXAMPLES = """
@@ -132,8 +141,16 @@ backup_path:
   returned: when backup is yes
   type: str
   sample: /playbooks/ansible/backup/smartcs_config.2019-03-16@16:00:16
+command_timings:
+  description: The timings of the commands sent to the device, in the order they were sent
+  returned: when command_timings is true
+  type: list
+  elements: dict
+  sample: [{"command": "set tty 1 baud 19200", "device_time": 0.052, "ipc_time": 0.003, "bytes": 0}]
 """
 
+import time
+
 from ansible.module_utils._text import to_text
 from ansible.module_utils.connection import ConnectionError
 from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
@@ -147,7 +164,10 @@ from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smar
     smartcs_argument_spec,
 )
 from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
-    compareble_config,
+    get_config_digest,
+)
+from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
+    add_ipc_time,
 )
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.config import (
@@ -160,11 +180,14 @@ def check_args(module, warnings):
     pass
 
 
-def edit_config(connection, commands, module):
+def edit_config(connection, commands, module, timings=None):
+    start = time.time()
     try:
-        connection.edit_config(candidate=commands)
+        resp = connection.edit_config(candidate=commands, timings=timings is not None)
     except Exception:
         module.fail_json(msg='An invalid command was specified. \"%s\"' % commands)
+    if timings is not None:
+        timings.extend(add_ipc_time(resp['timings'], time.time() - start))
 
 
 def get_candidate_config(module):
@@ -186,7 +209,7 @@ def get_running_config(module, current_config=None, flags=None):
     return running
 
 
-def save_config(module, result):
+def save_config(module, result, timings=None):
     result['changed'] = True
     if not module.check_mode:
         write_command = [{
@@ -195,7 +218,7 @@ def save_config(module, result):
             'answer': 'y\r',
             'newline': False
         }]
-        run_commands(module, write_command)
+        run_commands(module, write_command, timings=timings)
     else:
         module.warn('Skipping command `write` due to check_mode.')
 
@@ -210,7 +233,8 @@ def main():
         backup=dict(type='bool', default=False),
         save_when=dict(
             choices=['always', 'never', 'modified', 'changed'], default='never'
-        )
+        ),
+        command_timings=dict(type='bool', default=False)
     )
 
     argument_spec.update(smartcs_argument_spec)
@@ -230,6 +254,7 @@ def main():
     contents = None
     flags = []
     connection = get_connection(module)
+    timings = list() if module.params['command_timings'] else None
 
     if module.params['backup']:
         contents = get_config(module, flags=flags)
@@ -258,31 +283,25 @@ def main():
             # send the configuration commands to the device and merge
             # them with the current running config
             if not module.check_mode:
-                edit_config(connection, commands, module)
+                edit_config(connection, commands, module, timings)
 
             result['changed'] = True
 
-    startup_config = None
-
     if module.params['save_when'] == 'always':
-        save_config(module, result)
+        save_config(module, result, timings)
     elif module.params['save_when'] == 'modified':
-        output = run_commands(module, ['show config running', 'show config startup'])
-
-        running_config = NetworkConfig(indent=1, contents=output[0], ignore_lines=None)
-        startup_config = NetworkConfig(indent=1, contents=output[1], ignore_lines=None)
-
-        running_config_compareble, startup_config_compareble = compareble_config(running_config, startup_config)
-
-        if running_config_compareble != startup_config_compareble:
-            save_config(module, result)
+        if get_config_digest(module, 'running') != get_config_digest(module, 'startup'):
+            save_config(module, result, timings)
     elif module.params['save_when'] == 'changed' and result['changed']:
-        save_config(module, result)
+        save_config(module, result, timings)
 
     if module._diff:
-        output = run_commands(module, 'show config running')
+        output = run_commands(module, 'show config running', timings=timings)
         contents = output[0]
 
+    if timings is not None:
+        result['command_timings'] = timings
+
     module.exit_json(**result)
 
 
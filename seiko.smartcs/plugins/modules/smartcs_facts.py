@@ -46,6 +46,51 @@ options:
     default: '!config'
     type: list
     elements: str
+  tty:
+    description:
+    - Specifies the ttys whose tty facts are collected. It can be set in ttylist format (1-16, 1, 2-8, 16).
+      When not set, the tty facts of all the ttys are collected.
+    required: false
+    type: str
+    version_added: "1.8.0"
+  config_sections:
+    description:
+    - Specifies the sections of the running configuration collected by the config subset,
+      such as C(tty), C(portd) or C(user).
+      When set, only the given sections are fetched from the device and returned in
+      ansible_net_config_sections instead of the whole configuration in ansible_net_config.
+    required: false
+    type: list
+    elements: str
+    version_added: "1.8.0"
+  cache_dir:
+    description:
+    - Specifies the directory on the controller where the collected facts are cached.
+      The facts are cached per serial number of the device, and a subset found in the
+      cache is returned without running its commands on the device until it becomes
+      older than cache_ttl.
+      The directory path can be the absolute pathname or relative pathname from the playbook or
+      role root directory.
+      When not set, the facts are always collected from the device.
+    required: false
+    type: path
+    version_added: "1.8.0"
+  cache_ttl:
+    description:
+    - Specifies the number of seconds a subset in the facts cache is used.
+    required: false
+    default: 3600
+    type: int
+    version_added: "1.8.0"
+  cache_refresh:
+    description:
+    - Specifies the subsets collected from the device even if they are found in the facts cache.
+    - Possible values for this argument include C(all), C(default), C(config) and C(tty)
+    required: false
+    default: []
+    type: list
+    elements: str
+    version_added: "1.8.0"
 """
 
 EXAMPLES = """
@@ -62,6 +107,28 @@ EXAMPLES = """
   seiko.smartcs.smartcs_facts:
     gather_subset:
       - "!tty"
+
+- name: Collect the tty facts of tty 1 to 8 only
+  seiko.smartcs.smartcs_facts:
+    gather_subset:
+      - tty
+    tty: 1-8
+
+- name: Collect the tty and portd sections of the running configuration
+  seiko.smartcs.smartcs_facts:
+    gather_subset:
+      - config
+    config_sections:
+      - tty
+      - portd
+
+- name: Collect all facts, reusing the facts cached within a day except the tty facts
+  seiko.smartcs.smartcs_facts:
+    gather_subset: all
+    cache_dir: facts_cache
+    cache_ttl: 86400
+    cache_refresh:
+      - tty
 """
 
 RETURN = """
@@ -115,12 +182,19 @@ ansible_net_eth2:
   description: The configured eth1 interfaces of the remote device
   returned: always
   type: dict
+ansible_net_interfaces:
+  description: The configured interfaces of the remote device, keyed by interface name
+  returned: always
+  type: dict
+  version_added: "1.8.0"
 
 # tty
 ansible_net_tty:
   description:
     - The configured each tty information
     - baud, bitchar, flow, parity, stop, and label
+    - rw_sessions, ro_sessions, mode, rw, auth, timestamp, timestamp_format,
+      send_nl, recv_nl_mode and recv_nl of the portd settings
   returned: when tty is configured
   type: list
 
@@ -129,6 +203,20 @@ ansible_net_config:
   description: The current active config from the device
   returned: when config is configured
   type: str
+
+ansible_net_config_sections:
+  description: The requested sections of the running configuration, keyed by section name
+  returned: when config is configured and config_sections is set
+  type: dict
+ansible_net_config_digests:
+  description: The SHA-256 digest of each section in ansible_net_config_sections
+  returned: when config is configured and config_sections is set
+  type: dict
+
+ansible_net_cached_subset:
+  description: The list of fact subsets returned from the facts cache
+  returned: when cache_dir is configured
+  type: list
 """
 
 from ansible.module_utils.basic import AnsibleModule
@@ -38,6 +38,15 @@ options:
       the response character string as a numerical value.
     default: 10
     type: int
+  command_timings:
+    description:
+    - Returns the time each command took in command_timings. The commands sent to a tty
+      carry the tty number.
+    - The device_time of a command is measured on the persistent connection, and the
+      ipc_time is its share of the rest of the time of the request that carried it.
+    default: false
+    type: bool
+    version_added: "1.8.0"
   custom_response:
     description:
     - Returns values as the customized format to be able to recognize sent characters(execute_command)
@@ -57,6 +66,22 @@ options:
     type: bool
     default: no
     version_added: "1.1.0"
+  early_completion:
+    description:
+    - Ends the sends that otherwise always take their full delay as soon as the expected
+      string is received, with the delay as their timeout.
+    - The initial_prompt_check_cmd and escape_cmd return when initial_prompt is received.
+      initial_prompt is registered as the 8th recvchar_regex for this during the
+      pre-check and cleared once the pre-check is done. The recvchar, recvchar_regex
+      and error_recvchar_regex left on the session by earlier tasks are cleared
+      before the pre-check, so they do not end it early.
+    - A sendchar with __NOWAIT__:sec returns when a recvchar or recvchar_regex is received.
+      Reaching the delay is not reported as an error, so the following sendchar must be
+      sent anyway and error_detect_on_sendchar must be set to exec.
+      A __HEX__ sendchar is always sent with its delay.
+    default: false
+    type: bool
+    version_added: "1.8.0"
   error_detect_on_sendchar:
     description:
     - If an error occurs after sending the string set in sendchar, specify whether
@@ -124,6 +149,15 @@ options:
     default: 5
     version_added: "1.1.0"
     type: int
+  initial_prompt_skip_failed:
+    description:
+    - When the initial prompt is not received from some of the ttys, skips them and
+      sends sendchar to the others instead of failing.
+    - The pre-check is then run on each tty on its own, one after another, and whether
+      each tty passed it is returned in tty_ready.
+    default: false
+    type: bool
+    version_added: "1.8.0"
   nl:
     description:
     - Specify the line feed code to be sent.
@@ -133,6 +167,28 @@ options:
     - cr
     - lf
     type: str
+  output_dir:
+    description:
+    - Specifies the directory on the controller where the responses of each tty are written.
+      The responses of a tty are written to the file tty<tty number>.log as soon as all
+      strings have been sent to that tty, and only the list of written files is returned
+      instead of stdout, stdout_lines and stdout_lines_custom.
+      An existing file with the same name is overwritten.
+      The directory path can be the absolute pathname or relative pathname from the playbook or
+      role root directory. The directory is created if it does not exist.
+    type: path
+    version_added: "1.8.0"
+  pacing:
+    description:
+    - Paces the sendchar with __NOWAIT__ to the speed of each tty, read from the
+      baud, bit, parity and stop settings shown by show tty.
+    - They are sent back to back until the tty has one second of data to transmit,
+      and then one is sent with a delay of the seconds it needs to catch up.
+    - Ttys with flow control are not paced, as they hold the data back themselves.
+    - The sendchar without __NOWAIT__ wait for recvchar and are not paced.
+    default: false
+    type: bool
+    version_added: "1.8.0"
   recvchar:
     description:
     - Set a list of received strings expected to be output after sending the string set in sendchar.
@@ -159,6 +215,25 @@ options:
       This option is exclusive with the sendchar option.
     type: str
     version_added: "1.1.0"
+  timeout_profile_apply:
+    description:
+    - Sends the sendchar with the timeouts proposed from timeout_profile_dir instead of
+      cmd_timeout and __WAIT__:sec.
+    default: false
+    type: bool
+    version_added: "1.8.0"
+  timeout_profile_dir:
+    description:
+    - Specifies the directory on the controller where the response times of the sendchar
+      that wait for recvchar are recorded, per serial number of the device, tty and sendchar.
+      The sendchar are recorded as hashes, not as text.
+    - Once a sendchar has 5 response times, twice the 95th percentile of the last 20 is
+      returned in timeout_proposals as its timeout, but never more than cmd_timeout or
+      its __WAIT__:sec.
+      The directory path can be the absolute pathname or relative pathname from the playbook or
+      role root directory.
+    type: path
+    version_added: "1.8.0"
   tty:
     description:
     - Set the tty to send a string. It can be set in ttylist format (1-16, 1, 2-8, 16).
@@ -191,17 +266,75 @@ EXAMPLES = """
       - user01
       - secret01
       - show version
+
+- name: Check the console of tty 1 without waiting for the whole timeouts
+  seiko.smartcs.smartcs_tty_command:
+    tty: 1
+    early_completion: true
+    initial_prompt: 'SWITCH> '
+    escape_cmd: __CTL__:03
+    error_detect_on_sendchar: exec
+    recvchar:
+      - 'SWITCH> '
+    sendchar:
+      - __NL__
+      - reload__NOWAIT__:30
+
+- name: Push a configuration to tty 1 and 2 as fast as their baud rates allow
+  seiko.smartcs.smartcs_tty_command:
+    tty: 1-2
+    pacing: true
+    recvchar:
+      - 'SWITCH# '
+      - 'SWITCH(config)# '
+    sendchar:
+      - configure terminal
+      - interface GigabitEthernet0/1__NOWAIT__
+      - description uplink__NOWAIT__
+      - no shutdown__NOWAIT__
+      - end
+
+- name: Check the console of tty 1 to 8 with timeouts learned from the previous runs
+  seiko.smartcs.smartcs_tty_command:
+    tty: 1-8
+    timeout_profile_dir: profiles
+    timeout_profile_apply: true
+    recvchar:
+      - 'SWITCH> '
+    sendchar:
+      - __NL__
+      - show version
+
+- name: Check the console of tty 1 to 48, skipping the ttys whose console does not answer
+  seiko.smartcs.smartcs_tty_command:
+    tty: 1-48
+    initial_prompt: 'SWITCH> '
+    initial_prompt_skip_failed: true
+    recvchar:
+      - 'SWITCH> '
+    sendchar:
+      - show version
+
+- name: Save the console output of tty 1 to 48 in the logs directory
+  seiko.smartcs.smartcs_tty_command:
+    tty: 1-48
+    output_dir: logs
+    recvchar:
+      - 'SWITCH# '
+    sendchar:
+      - __NL__
+      - show tech-support
 """
 
 RETURN = """
 stdout:
   description: The set of responses from the commands via SmartCS
-  returned: always apart from low level errors (such as action plugin)
+  returned: When the output_dir setting is not valid
   type: list
   sample: ['...', '...']
 stdout_lines:
   description: The value of stdout split into a list
-  returned: always apart from low level errors (such as action plugin)
+  returned: When the output_dir setting is not valid
   type: list
   sample: [['...', '...'], ['...'], ['...']]
 pre_stdout:
@@ -216,16 +349,47 @@ pre_stdout_lines:
   sample: [['...', '...'], ['...'], ['...']]
 stdout_lines_custom:
   description: The custom value of responses from the commands via SmartCS
-  returned: When the custom_response setting is valid and the command is executed successfully
+  returned: When the custom_response setting is valid, the output_dir setting is not valid
+            and the command is executed successfully
   type: list
   sample: [{'execute_command':'...', 'response':['...', '...']}]
+output_files:
+  description: The files where the responses of each tty have been written
+  returned: When the output_dir setting is valid and the command is executed successfully
+  type: list
+  sample: [{'tty': 1, 'path': '/path/to/logs/tty1.log', 'size': 1024, 'errors': []}]
+command_timings:
+  description: The timings of the commands sent to SmartCS, in tty order
+  returned: when command_timings is true
+  type: list
+  elements: dict
+  sample: [{"tty": 1, "command": "ttysendwaitset tty 1 ...", "device_time": 1.204, "ipc_time": 0.004, "bytes": 236}]
+tty_ready:
+  description: Whether the initial prompt was received from each tty
+  returned: When the initial_prompt and initial_prompt_skip_failed settings are valid
+  type: dict
+  sample: {"1": true, "2": false}
+timeout_proposals:
+  description: The timeouts proposed from the response times recorded in timeout_profile_dir,
+               with the index of the sendchar they are for
+  returned: when timeout_profile_dir is set
+  type: list
+  elements: dict
+  sample: [{"tty": 1, "index": 1, "timeout": 3, "configured": 10, "samples": 12}]
 """
 
+import hashlib
+import math
+import os
+
+from ansible.module_utils._text import to_bytes, to_text
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
+    NEWLINE,
     WAITSEC,
     NOWAIT,
     NOWAITSEC,
+    CTLCHAR,
     HEXSTR,
 )
 from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
@@ -237,10 +401,13 @@ from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smar
     check_cmdto,
     check_recvchar,
     check_return_error,
+    check_output_error,
+    find_return_errors,
 )
 from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
     get_clicmd_ttysend_waitset,
     get_clicmd_ttysend_delay,
+    get_clicmd_ttysend_early,
     get_clicmd_ttysend,
 )
 from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
@@ -250,25 +417,48 @@ from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smar
 from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
     pre_check,
     pre_action,
+    pre_action_per_tty,
 )
 from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
     change_hyphen_list_to_comma_list,
     edit_responses,
+    remove_sendstr,
+    remove_wait_timeout,
     custom_responses,
 )
 from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
     to_lines,
 )
 from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
-    run_commands,
+    run_tty_script,
+    run_tty_script_per_tty,
 )
 from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
     smartcs_argument_spec,
     check_args,
+    get_capabilities,
+    read_cache_file,
+    write_cache_file,
+)
+from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.facts.legacy.base import (
+    Tty,
 )
 
 
-def param_to_commands(module):
+def get_sendchar(module):
+    if module.params['src']:
+        return module.params['src'].splitlines()
+    return module.params['sendchar']
+
+
+def get_ttylist(module):
+    try:
+        return change_hyphen_list_to_comma_list(module.params['tty'])
+    except ValueError:
+        module.fail_json(msg='tty parameter is invalid. input value is an integer from 1 to 48')
+
+
+def settings_to_commands(module):
     commands = list()
 
     tty = module.params['tty']
@@ -286,11 +476,6 @@ def param_to_commands(module):
     if not sendchar and not src:
         module.fail_json(msg='sendchar or src parameter is required')
 
-    if src:
-        sendchar = module.params['src'].splitlines()
-    elif sendchar:
-        sendchar = module.params['sendchar']
-
     # set nl
     commands.append('terminal ttymanage nl %s' % nl)
 
@@ -324,55 +509,289 @@ def param_to_commands(module):
         for index, erecv in enumerate(error_recvchar_regex, 1):
             commands.append(terminal_ttymanage_errregex_input(index, erecv))
 
-    # <ttysend>
-    #
-    try:
-        ttylist = change_hyphen_list_to_comma_list(tty)
-    except ValueError:
-        module.fail_json(msg='tty parameter is invalid. input value is an integer from 1 to 48')
+    return commands
+
+
+def get_tty_lines(module, warnings):
+    # The serial settings of the ttys, as gathered by the tty facts
+    facts = Tty(module)
+    facts.populate()
+    lines = dict((entry['tty'], entry) for entry in facts.facts['tty'])
+    for ttynum in get_ttylist(module):
+        if ttynum not in lines:
+            warnings.append('the settings of tty %d are unknown, its sendchar are not paced' % ttynum)
+    return lines
+
+
+def chars_per_second(line):
+    # A start bit, the data bits, the parity bit and the stop bits
+    bits = 1 + line['bitchar'] + (0 if line['parity'] == 'none' else 1) + line['stop']
+    return line['baud'] / bits
+
+
+def sendchar_size(cmd, nl):
+    nl_size = 2 if nl == 'crlf' else 1
+    if NEWLINE in cmd:
+        return nl_size
+    elif CTLCHAR in cmd:
+        return 1
+    return len(cmd) + nl_size
+
+
+# The timeout profile keeps the last PROFILE_SAMPLES response times of a
+# sendchar, and proposes PROFILE_MARGIN times their PROFILE_PERCENTILE
+# percentile once it has PROFILE_MIN_SAMPLES of them.
+PROFILE_SAMPLES = 20
+PROFILE_MIN_SAMPLES = 5
+PROFILE_PERCENTILE = 95
+PROFILE_MARGIN = 2
+
+
+def get_profile_path(module, warnings):
+    serialnum = get_capabilities(module)['device_info'].get('network_os_serialnum')
+    if not serialnum:
+        warnings.append('unable to get the serial number, the timeout profile is not used')
+        return None
+    return os.path.join(module.params['timeout_profile_dir'], 'smartcs_tty_profile_%s.json' % serialnum)
+
+
+def profile_key(cmd):
+    return hashlib.sha256(to_bytes(cmd, errors='surrogate_then_replace')).hexdigest()
+
+
+def profile_timeout(samples, timeout):
+    # Nearest-rank percentile, capped by the configured timeout
+    if not samples or len(samples) < PROFILE_MIN_SAMPLES:
+        return None
+    samples = sorted(samples)
+    rank = int(math.ceil(PROFILE_PERCENTILE / 100 * len(samples)))
+    proposed = int(math.ceil(samples[rank - 1] * PROFILE_MARGIN))
+    return min(max(proposed, 1), timeout)
+
+
+def sendchar_timeout(module, cmd):
+    # The timeout of a sendchar sent with ttysendwaitset, or None
+    if WAITSEC in cmd:
+        return parse_optsec(module, cmd, WAITSEC)
+    elif NOWAIT in cmd or HEXSTR in cmd:
+        return None
+    return module.params['cmd_timeout']
+
+
+def get_timeout_proposals(module, ttys, sendchar, profile):
+    proposals = list()
+    for ttynum in ttys:
+        tty_profile = profile.get(str(ttynum), {})
+        for index, cmd in enumerate(map(str, sendchar)):
+            timeout = sendchar_timeout(module, cmd)
+            if timeout is None:
+                continue
+            samples = tty_profile.get(profile_key(cmd))
+            proposed = profile_timeout(samples, timeout)
+            if proposed is not None:
+                proposals.append(dict(tty=ttynum, index=index, timeout=proposed,
+                                      configured=timeout, samples=len(samples)))
+    return proposals
+
+
+def record_profile(module, profile, sendchar, timings):
+    # The timings of a tty are in the order of its commands, the first being
+    # the tty setting and the others one per sendchar.
+    tty_timings = dict()
+    for timing in timings:
+        if 'tty' in timing:
+            tty_timings.setdefault(timing['tty'], []).append(timing)
+
+    for ttynum, items in tty_timings.items():
+        tty_profile = profile.setdefault(str(ttynum), {})
+        for cmd, timing in zip(map(str, sendchar), items[1:]):
+            if sendchar_timeout(module, cmd) is None:
+                continue
+            samples = tty_profile.setdefault(profile_key(cmd), [])
+            samples.append(round(timing['device_time'], 3))
+            del samples[:-PROFILE_SAMPLES]
+
+
+def tty_to_commands(module, ttynum, sendchar, line=None, timeouts=None):
+    commands = list()
+
+    nl = module.params['nl']
+    cmd_timeout = module.params['cmd_timeout']
 
-    for ttynum in ttylist:
-        # set tty
-        commands.append('terminal ttymanage tty %d' % ttynum)
-        for cmd in sendchar:
-            cmd = str(cmd)
-
-            # __WAIT__:sec
-            if WAITSEC in cmd:
-                cmd_l = parse_cmd(module, cmd, WAITSEC)
-                timeout = parse_optsec(module, cmd, WAITSEC)
-                commands.append(get_clicmd_ttysend_waitset(module, ttynum, nl, cmd_l, timeout))
-
-            # __NOWAIT__:sec
-            elif NOWAITSEC in cmd:
-                cmd_l = parse_cmd(module, cmd, NOWAITSEC)
-                delay = parse_optsec(module, cmd, NOWAITSEC)
+    # With pacing, backlog counts the characters the tty still has to transmit
+    # after the sendchar sent without waiting.
+    cps = chars_per_second(line) if line and line['flow'] == 'none' else None
+    backlog = 0
+    timeouts = timeouts or dict()
+
+    # set tty
+    commands.append('terminal ttymanage tty %d' % ttynum)
+    for index, cmd in enumerate(sendchar):
+        cmd = str(cmd)
+
+        # __WAIT__:sec
+        if WAITSEC in cmd:
+            cmd_l = parse_cmd(module, cmd, WAITSEC)
+            timeout = timeouts.get(index) or parse_optsec(module, cmd, WAITSEC)
+            commands.append(get_clicmd_ttysend_waitset(module, ttynum, nl, cmd_l, timeout))
+
+        # __NOWAIT__:sec
+        elif NOWAITSEC in cmd:
+            cmd_l = parse_cmd(module, cmd, NOWAITSEC)
+            delay = parse_optsec(module, cmd, NOWAITSEC)
+            if module.params['early_completion']:
+                commands.append(get_clicmd_ttysend_early(module, ttynum, nl, cmd_l, delay))
+            else:
                 commands.append(get_clicmd_ttysend_delay(module, ttynum, nl, cmd_l, delay))
 
-            # __NOWAIT__
-            elif NOWAIT in cmd:
-                cmd_l = parse_cmd(module, cmd, NOWAIT)
+        # __NOWAIT__
+        elif NOWAIT in cmd and HEXSTR not in cmd:
+            cmd_l = parse_cmd(module, cmd, NOWAIT)
+            delay = 0
+            if cps:
+                backlog += sendchar_size(cmd_l, nl)
+                delay = int(backlog // cps)
+                backlog -= delay * cps
+            if delay:
+                commands.append(get_clicmd_ttysend_delay(module, ttynum, nl, cmd_l, delay))
+            else:
                 commands.append(get_clicmd_ttysend(module, ttynum, nl, cmd_l))
+            continue
 
-            # __HEX__
-            elif HEXSTR in cmd:
-                commands.append(get_clicmd_ttysend(module, ttynum, nl, cmd))
+        # __HEX__ with __NOWAIT__
+        elif NOWAIT in cmd:
+            cmd_l = parse_cmd(module, cmd, NOWAIT)
+            commands.append(get_clicmd_ttysend(module, ttynum, nl, cmd_l))
+
+        # __HEX__
+        elif HEXSTR in cmd:
+            commands.append(get_clicmd_ttysend(module, ttynum, nl, cmd))
 
-            else:
-                commands.append(get_clicmd_ttysend_waitset(module, ttynum, nl, cmd, cmd_timeout))
-
-        if module.params['ttycmd_debug'] == 'off':
-            pass
-        elif module.params['ttycmd_debug'] == 'on':
-            commands.append('show terminal ttymanage')
-        elif module.params['ttycmd_debug'] == 'detail':
-            commands.append('show terminal ttymanage detail')
         else:
-            pass
+            timeout = timeouts.get(index) or cmd_timeout
+            commands.append(get_clicmd_ttysend_waitset(module, ttynum, nl, cmd, timeout))
+
+        # The other sendchar wait for the tty, so the backlog has been sent
+        backlog = 0
+
+    if module.params['ttycmd_debug'] == 'off':
+        pass
+    elif module.params['ttycmd_debug'] == 'on':
+        commands.append('show terminal ttymanage')
+    elif module.params['ttycmd_debug'] == 'detail':
+        commands.append('show terminal ttymanage detail')
+    else:
+        pass
 
     return commands
 
 
+def early_completion_indexes(module, sendchar):
+    # The responses of a tty to the __NOWAIT__:sec sent with ttysendwaitset,
+    # whose timeout is not an error. The first response is the one to the tty setting.
+    if not module.params['early_completion']:
+        return []
+    return [index for index, cmd in enumerate(map(str, sendchar), 1)
+            if WAITSEC not in cmd and NOWAITSEC in cmd and HEXSTR not in cmd]
+
+
+def tty_responses(item, indexes):
+    responses = list(item['responses'])
+    for index in indexes:
+        if index < len(responses):
+            responses[index] = remove_wait_timeout([responses[index]])[0]
+    return responses
+
+
+def run_pre_check(module, result, timings=None):
+    # With initial_prompt_skip_failed, the pre-check is run on each tty and
+    # the ttys that failed it are skipped.
+    # Returns the responses and the ttys to send sendchar to.
+    ttylist = get_ttylist(module)
+    if not module.params['initial_prompt_skip_failed']:
+        return pre_action(module, timings), ttylist
+
+    items = pre_action_per_tty(module, ttylist, timings)
+    pre_response = list()
+    for item in items:
+        pre_response.extend(item['responses'])
+    result['tty_ready'] = dict((item['tty'], item['ready']) for item in items)
+
+    failed = [item for item in items if not item['ready']]
+    if len(failed) == len(items):
+        module.fail_json(msg='pre_check failed on every tty', tty_ready=result['tty_ready'])
+    for item in failed:
+        result['warnings'].append('tty %d is skipped: %s' % (item['tty'], item['msg']))
+
+    return pre_response, [item['tty'] for item in items if item['ready']]
+
+
+def param_to_script(module, lines=None, proposals=None, ttylist=None):
+    settings = settings_to_commands(module)
+    sendchar = get_sendchar(module)
+    lines = lines or dict()
+    timeouts = dict()
+    for proposal in proposals or []:
+        timeouts.setdefault(proposal['tty'], {})[proposal['index']] = proposal['timeout']
+
+    # <ttysend>
+    #
+    ttys = list()
+    for ttynum in ttylist or get_ttylist(module):
+        ttys.append(dict(tty=ttynum, commands=tty_to_commands(module, ttynum, sendchar, lines.get(ttynum),
+                                                              timeouts.get(ttynum))))
+
+    return settings, ttys
+
+
+def script_to_commands(settings, ttys):
+    commands = list(settings)
+    for item in ttys:
+        commands.extend(item['commands'])
+
+    return commands
+
+
+def write_tty_output(module, item, indexes):
+    # Only the summary is kept once the responses of a tty are written, so
+    # the memory of the module does not grow with the console output.
+    path = os.path.join(module.params['output_dir'], 'tty%d.log' % item['tty'])
+    responses = remove_sendstr(tty_responses(item, indexes)[1:])
+    with open(path, 'wb') as f:
+        for resp in responses:
+            f.write(to_bytes(resp + '\n', errors='surrogate_then_replace'))
+
+    return {
+        'tty': item['tty'],
+        'path': path,
+        'size': os.path.getsize(path),
+        'errors': find_return_errors(responses),
+    }
+
+
+def run_script(module, settings, ttys, indexes, timings=None):
+    # With output_dir, the ttymanage settings are applied once and then every
+    # tty is driven by its own request so its output can be written before the
+    # next tty is started.
+    if module.params['output_dir']:
+        script = run_tty_script(module, settings=settings, timings=timings)
+        script['ttys'] = run_tty_script_per_tty(module, ttys,
+                                                callback=lambda item: write_tty_output(module, item, indexes),
+                                                timings=timings)
+    else:
+        script = run_tty_script(module, settings=settings, ttys=ttys, timings=timings)
+
+    return script
+
+
+def script_responses(script, indexes):
+    responses = list(script['settings'])
+    for item in script['ttys']:
+        responses.extend(tty_responses(item, indexes))
+
+    return responses
+
+
 def main():
     """ Main entry point for Ansible module execution
     """
@@ -396,7 +815,14 @@ def main():
         escape_cmd=dict(type='str'),
         escape_cmd_timeout=dict(type='int', default=5),
         escape_cmd_retry=dict(type='int', default=3),
-        ttycmd_debug=dict(type='str', choices=['off', 'on', 'detail'], default='off')
+        ttycmd_debug=dict(type='str', choices=['off', 'on', 'detail'], default='off'),
+        output_dir=dict(type='path'),
+        command_timings=dict(type='bool', default=False),
+        early_completion=dict(type='bool', default=False),
+        pacing=dict(type='bool', default=False),
+        timeout_profile_dir=dict(type='path'),
+        timeout_profile_apply=dict(type='bool', default=False),
+        initial_prompt_skip_failed=dict(type='bool', default=False)
     )
 
     argument_spec.update(smartcs_argument_spec)
@@ -411,25 +837,64 @@ def main():
     check_args(module, warnings)
     result['warnings'] = warnings
 
+    if module.params['early_completion'] and module.params['error_detect_on_sendchar'] != 'exec':
+        # With cancel, a send that reaches its delay would stop the following ones
+        module.fail_json(msg='early_completion requires error_detect_on_sendchar=exec')
+
+    output_dir = module.params['output_dir']
+    if output_dir and not os.path.isdir(output_dir):
+        try:
+            os.makedirs(output_dir)
+        except OSError as exc:
+            module.fail_json(msg='unable to create output_dir: %s' % to_text(exc))
+
+    profile_path = None
+    if module.params['timeout_profile_dir']:
+        profile_path = get_profile_path(module, warnings)
+    profile = read_cache_file(profile_path) if profile_path else dict()
+    timings = list() if module.params['command_timings'] or profile_path else None
+    ttylist = None
     if pre_check(module):
-        pre_response = pre_action(module)
-
-    commands = param_to_commands(module)
-    result['commands'] = commands
-
-    responses = run_commands(module, commands)
-
-    responses = edit_responses(module, responses)
-    check_return_error(module, responses)
+        pre_response, ttylist = run_pre_check(module, result, timings)
+
+    lines = get_tty_lines(module, warnings) if module.params['pacing'] else None
+    proposals = None
+    if profile_path:
+        proposals = get_timeout_proposals(module, get_ttylist(module), get_sendchar(module), profile)
+        result['timeout_proposals'] = proposals
+    settings, ttys = param_to_script(module, lines, proposals if module.params['timeout_profile_apply'] else None,
+                                     ttylist)
+    result['commands'] = script_to_commands(settings, ttys)
+
+    indexes = early_completion_indexes(module, get_sendchar(module))
+    script_timings = None if timings is None else list()
+    script = run_script(module, settings, ttys, indexes, script_timings)
+    if timings is not None:
+        timings.extend(script_timings)
+
+    if profile_path:
+        # The pre-check timings carry a tty too, so only those of the
+        # script are recorded.
+        record_profile(module, profile, get_sendchar(module), script_timings)
+        try:
+            write_cache_file(profile_path, profile)
+        except (IOError, OSError) as exc:
+            warnings.append('unable to write the timeout profile: %s' % to_text(exc))
+
+    if output_dir:
+        check_output_error(module, script['ttys'])
+        result['output_files'] = script['ttys']
+    else:
+        responses = edit_responses(module, script_responses(script, indexes), len(script['settings']))
+        check_return_error(module, responses)
 
-    result.update({
-        'changed': False,
-        'stdout': responses,
-        'stdout_lines': list(to_lines(responses))
-    })
+        result.update({
+            'stdout': responses,
+            'stdout_lines': list(to_lines(responses))
+        })
 
     cstm_resp = module.params['custom_response']
-    if cstm_resp:
+    if cstm_resp and not output_dir:
         result.update({
             'stdout_lines_custom': custom_responses(module, to_lines(responses),
                                                     module.params['custom_response_delete_nl'],
@@ -442,6 +907,9 @@ def main():
             'pre_stdout_lines': list(to_lines(pre_response))
         })
 
+    if module.params['command_timings']:
+        result['command_timings'] = timings
+
     module.exit_json(**result)
 
 
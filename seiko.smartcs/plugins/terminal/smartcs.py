@@ -22,35 +22,97 @@ __metaclass__ = type
 
 import json
 import re
+import time
 
 from ansible.errors import AnsibleConnectionFailure
 from ansible.module_utils._text import to_text, to_bytes
 from ansible.plugins.terminal import TerminalBase
 
 
+# The longest prompt matched by terminal_stdout_re, with the newline before it
+PROMPT_MAXLEN = 128
+
+# The CLI prompt at the start of a line, used to count the prompts in a response
+PROMPT_LINE_RE = re.compile(br"^[*]?\([0-9]{1,3}\)(?:\[[0-9:]{8}\])?[a-zA-Z0-9][a-zA-Z0-9-_.]{0,63}[>#] ?", re.M)
+
+TERMINAL_COMMANDS = (b'terminal page disable', b'terminal redisp off', b'terminal width 256')
+
+
+class LiteralFilteredRegex(object):
+    """ A compiled regex that is only run when the data contains one of the
+    literals that every match of it contains, from the first of them
+    """
+
+    def __init__(self, pattern, literals, lookbehind=0):
+        self.regex = re.compile(pattern)
+        self.pattern = self.regex.pattern
+        self.literals = literals
+        # The most bytes a match starts before its literal
+        self.lookbehind = lookbehind
+
+    def search(self, data, pos=0):
+        start = None
+        for literal in self.literals:
+            index = data.find(literal, pos)
+            if index != -1 and (start is None or index < start):
+                start = index
+        if start is None:
+            return None
+        return self.regex.search(data, max(start - self.lookbehind, pos))
+
+
+class TailRegex(object):
+    """ A compiled regex anchored at the end of the data, that is only run on
+    the last maxlen bytes
+    """
+
+    def __init__(self, pattern, maxlen):
+        self.regex = re.compile(pattern)
+        self.pattern = self.regex.pattern
+        self.maxlen = maxlen
+
+    def search(self, data, pos=0):
+        # '^' does not match at pos, so it still means the start of data
+        return self.regex.search(data, max(len(data) - self.maxlen, pos))
+
+
 class TerminalModule(TerminalBase):
 
     terminal_stdout_re = [
-        re.compile(br"(^|\r|\n)[*]?\([0-9]{1,3}\)(\[[0-9:]{8}\])?[a-zA-Z0-9][a-zA-Z0-9-_.]{0,63}(?:[>#])[ ]$")
+        TailRegex(br"(^|\r|\n)[*]?\([0-9]{1,3}\)(\[[0-9:]{8}\])?[a-zA-Z0-9][a-zA-Z0-9-_.]{0,63}(?:[>#])[ ]$",
+                  PROMPT_MAXLEN)
     ]
 
+    # The error messages are matched by a single regex, which is only run on
+    # the responses that contain one of them.
     terminal_stderr_re = [
-        re.compile(br"(\r|\n)Error:[^:\s][\S ]+\(\d*\)(\r|\n)"),
-        re.compile(br"(^|\r|\n)incorrect password"),
-        re.compile(br".* <-- no such command"),
-        re.compile(br".* <-- unexpected character( string)?"),
-        re.compile(br".* <-- open quotation"),  # Not output
-        re.compile(br".* <-- quotation over"),  # Not output
-        re.compile(br".* <-- syntax error"),
-        re.compile(br".* <-- too many parameters"),
-        re.compile(br".* <-- not enough parameter"),
-        re.compile(br".* <-- ambiguous parameter")
+        LiteralFilteredRegex(
+            br"(\r|\n)Error:[^:\s][\S ]+\(\d*\)(\r|\n)"
+            br"|(^|\r|\n)incorrect password"
+            br"| <-- (no such command"
+            br"|unexpected character( string)?"
+            br"|open quotation"  # Not output
+            br"|quotation over"  # Not output
+            br"|syntax error"
+            br"|too many parameters"
+            br"|not enough parameter"
+            br"|ambiguous parameter)",
+            (b' <-- ', b'Error:', b'incorrect password'),
+            lookbehind=1
+        )
     ]
 
+    # The prompt of the shell on_become has just set the parameters in. The
+    # terminal plugin is kept across reconnects, so on_open_shell only reads
+    # it once and on_close_shell clears it.
+    _terminal_prompt = None
+
     def on_open_shell(self):
+        prompt, self._terminal_prompt = self._terminal_prompt, None
+        if prompt is not None and prompt == self._get_prompt():
+            return
         try:
-            for cmd in (b'terminal page disable', b'terminal redisp off', b'terminal width 256'):
-                self._exec_cli_command(cmd)
+            self._set_terminal_parameters()
         except AnsibleConnectionFailure:
             raise AnsibleConnectionFailure('unable to set terminal parameters')
 
@@ -75,11 +137,13 @@ class TerminalModule(TerminalBase):
             raise AnsibleConnectionFailure('unable to elevate privilege to enable mode, at prompt [%s] with error: %s' % (prompt, e.message))
 
         try:
-            for cmd in (b'terminal page disable', b'terminal redisp off', b'terminal width 256'):
-                self._exec_cli_command(cmd)
+            self._set_terminal_parameters()
         except AnsibleConnectionFailure:
             raise AnsibleConnectionFailure('unable to set root terminal parameters')
 
+    def on_close_shell(self):
+        self._terminal_prompt = None
+
     def on_unbecome(self):
         prompt = self._get_prompt()
         if prompt is None:
@@ -91,3 +155,15 @@ class TerminalModule(TerminalBase):
 
         elif prompt.endswith(b'# '):
             self._exec_cli_command(b'exit ')
+
+    def _set_terminal_parameters(self):
+        # The commands are sent in one go and the responses are read until
+        # the prompt of each of them has been received.
+        start = time.time()
+        for cmd in TERMINAL_COMMANDS:
+            self._connection.send(cmd, sendonly=True)
+        output = b''
+        while len(PROMPT_LINE_RE.findall(output)) < len(TERMINAL_COMMANDS):
+            output += b'\n' + self._connection.receive(strip_prompt=False)
+        self._terminal_prompt = self._get_prompt()
+        self._connection.queue_message('vvvv', 'terminal parameters set in %.3f seconds' % (time.time() - start))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2026 Seiko Solutions Inc. all rights reserved.
+#
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Benchmark of the configuration diff used by Cliconf.get_diff.
+
+Compares diff_flat_config with NetworkConfig.difference(match='line') on a
+synthetic SmartCS running configuration made of create user, set portd and
+set tty lines, after checking that both return the same config_diff.
+The collection must be importable as ansible_collections.seiko.smartcs.
+
+Usage:
+    python bench_config_diff.py --running-lines 10000 --candidate-lines 1000
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import timeit
+
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.config import (
+    NetworkConfig,
+    dumps,
+)
+from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
+    diff_flat_config,
+)
+
+
+LINE_FORMATS = (
+    'create user user{0} group normal uid {0} password',
+    'set portd tty {0} label TTY_{0}',
+    'set tty {0} baud 9600',
+)
+
+
+def make_config(lines, changed=0):
+    config = list()
+    for index in range(lines):
+        line = LINE_FORMATS[index % len(LINE_FORMATS)].format(index)
+        if changed and index % changed == 0:
+            line = line.replace('9600', '19200').replace('normal', 'extusr')
+        config.append(line)
+    return '\n'.join(config)
+
+
+def network_config_diff(candidate, running):
+    candidate_obj = NetworkConfig(indent=1)
+    candidate_obj.load(candidate)
+    running_obj = NetworkConfig(indent=1, contents=running)
+    configdiffobjs = candidate_obj.difference(running_obj, match='line')
+    return dumps(configdiffobjs, 'commands') if configdiffobjs else ''
+
+
+def flat_config_diff(candidate, running):
+    return '\n'.join(diff_flat_config(candidate, running))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--running-lines', type=int, default=10000,
+                        help='lines of the running configuration')
+    parser.add_argument('--candidate-lines', type=int, default=1000,
+                        help='lines of the candidate configuration')
+    parser.add_argument('--changed', type=int, default=10,
+                        help='one candidate line in CHANGED differs from running')
+    parser.add_argument('--number', type=int, default=1,
+                        help='diffs timed per implementation')
+    args = parser.parse_args()
+
+    running = make_config(args.running_lines)
+    candidate = make_config(args.candidate_lines, args.changed)
+
+    expected = network_config_diff(candidate, running)
+    if flat_config_diff(candidate, running) != expected:
+        raise SystemExit('the diffs disagree')
+
+    legacy_time = timeit.timeit(lambda: network_config_diff(candidate, running), number=args.number)
+    flat_time = timeit.timeit(lambda: flat_config_diff(candidate, running), number=args.number)
+
+    print('running / candidate lines : %d / %d' % (args.running_lines, args.candidate_lines))
+    print('lines in config_diff      : %d' % len(expected.split('\n')))
+    print('NetworkConfig.difference  : %.3f s/diff' % (legacy_time / args.number))
+    print('diff_flat_config          : %.3f s/diff' % (flat_time / args.number))
+    print('speedup                   : %.0fx' % (legacy_time / flat_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2026 Seiko Solutions Inc. all rights reserved.
+#
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Micro-benchmark of the parser of the default facts subset.
+
+Compares the single-pass parser of facts/legacy/base.py with the former
+per-field regular expressions on synthetic show version, show ip and
+show ipinterface outputs, after checking that both return the same facts.
+The collection must be importable as ansible_collections.seiko.smartcs.
+
+Usage:
+    python bench_default_parser.py --lines 5000 --number 20
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import re
+import timeit
+
+from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.facts.legacy.base import (
+    SHOW_IP_FIELDS,
+    SHOW_VERSION_FIELDS,
+    parse_fields,
+    parse_ipinterface,
+)
+
+
+SHOW_VERSION = """Model                 : NS-2250-48
+Serial No.            : 00012345
+System                : System Software Ver 3.1.1
+Main System           : Ver 3.1.1
+Backup System         : Ver 3.0.1
+BootROM               : Ver 1.6
+Boot Config           : internal startup1
+"""
+
+SHOW_IP = """Hostname         : NS-2250
+IPaddress(eth1)  : 192.168.0.1/255.255.255.0
+IPaddress(eth2)  : none
+IPaddress(bond1) : none
+"""
+
+IPINTERFACE_HEADER = ' Interface  Status  MTU   Type    IPaddress/Netmask(Prefixlen)\n'
+IPINTERFACE_MAIN = ' eth1       up      1500  static  192.168.0.1/255.255.255.0\n'
+IPINTERFACE_STATIC = '                    static  2001:db8::%x/64\n'
+IPINTERFACE_LINK = '                    link    fe80::280:15ff:fe41:a7a4/64\n'
+
+
+# The parser before the single-pass rewrite
+def legacy_search(pattern, data, group=1):
+    match = re.search(pattern, data)
+    if match:
+        return match.group(group)
+
+
+def legacy_version(data):
+    return dict(
+        version=legacy_search(r'System                : System Software Ver (.*)', data),
+        serialnum=legacy_search(r'Serial No.            : (.*)', data),
+        model=legacy_search(r'Model                 : (.*)', data),
+        mainsystem=legacy_search(r'Main System           : Ver (.*)', data),
+        backupsystem=legacy_search(r'Backup System         : Ver (.*)', data),
+        bootrom=legacy_search(r'BootROM               : Ver (.*)', data),
+        bootconfig=legacy_search(r'Boot Config           : (.*)', data),
+    )
+
+
+def legacy_ip(data):
+    return dict(
+        hostname=legacy_search(r'Hostname         : (.+)', data),
+        eth1=legacy_search(r'IPaddress\(eth1\)  : (.+)', data),
+        eth2=legacy_search(r'IPaddress\(eth2\)  : (.+)', data),
+        bond1=legacy_search(r'IPaddress\(bond1\) : (.+)', data),
+    )
+
+
+def legacy_interface(data):
+    static = r' (bond1|eth1|eth2)(.*)(up|down)(.*)([1-9].+)(.*)static  (.*)/(.*)'
+    link = r' (bond1|eth1|eth2)(.*)(up|down)(.*)([1-9].+)(.*)link    (.*)/(.*)'
+    facts = dict()
+    for prefix, group in (('v4_ip', 7), ('v4_mask', 8)):
+        match = re.search(static, data)
+        facts[prefix] = match.group(group) if match and '.' in match.group(7) else None
+    for prefix, group in (('v6_ip', 1), ('v6_mask', 2)):
+        match1 = re.search(static, data)
+        match2 = re.search(r'                    static  (.+)/(.+)', data)
+        facts[prefix] = None
+        if match1 and ':' in match1.group(7):
+            facts[prefix] = match1.group(group + 6)
+        elif match2:
+            facts[prefix] = match2.group(group)
+    for prefix, group in (('v6_linklocal_ip', 1), ('v6_linklocal_mask', 2)):
+        match1 = re.search(link, data)
+        match2 = re.search(r'                    link    (.+)/(.+)', data)
+        facts[prefix] = None
+        if match1:
+            facts[prefix] = match1.group(group + 6)
+        elif match2:
+            facts[prefix] = match2.group(group)
+    return facts
+
+
+def legacy_parse(shver, ship, shif):
+    return legacy_version(shver), legacy_ip(ship), legacy_interface(shif)
+
+
+def single_pass_parse(shver, ship, shif):
+    return (parse_fields(shver, SHOW_VERSION_FIELDS),
+            parse_fields(ship, SHOW_IP_FIELDS, empty=False),
+            parse_ipinterface(shif)['eth1'])
+
+
+def make_outputs(lines):
+    filler = ''.join('Ether Address(eth%d)   : 00:80:15:41:%02x:%02x\n' % (i, i // 256 % 256, i % 256)
+                     for i in range(lines))
+    shver = filler + SHOW_VERSION
+    ship = filler + SHOW_IP
+    shif = (IPINTERFACE_HEADER + IPINTERFACE_MAIN
+            + ''.join(IPINTERFACE_STATIC % i for i in range(1, lines + 1))
+            + IPINTERFACE_LINK)
+    return shver, ship, shif
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--lines', type=int, default=5000,
+                        help='filler lines added to each output')
+    parser.add_argument('--number', type=int, default=20,
+                        help='parses timed per implementation')
+    args = parser.parse_args()
+
+    outputs = make_outputs(args.lines)
+    legacy = legacy_parse(*outputs)
+    single = single_pass_parse(*outputs)
+    if legacy != single:
+        raise SystemExit('the parsers disagree:\n%s\n%s' % (legacy, single))
+
+    legacy_time = timeit.timeit(lambda: legacy_parse(*outputs), number=args.number)
+    single_time = timeit.timeit(lambda: single_pass_parse(*outputs), number=args.number)
+
+    print('lines per output : %d' % args.lines)
+    print('legacy regex     : %.3f ms/parse' % (legacy_time * 1000 / args.number))
+    print('single pass      : %.3f ms/parse' % (single_time * 1000 / args.number))
+    print('speedup          : %.1fx' % (legacy_time / single_time))
+
+
+if __name__ == '__main__':
+    main()
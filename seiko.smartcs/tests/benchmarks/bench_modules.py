@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2026 Seiko Solutions Inc. all rights reserved.
+#
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+End-to-end benchmark of the modules against the SmartCS simulator.
+
+Starts smartcs_sim.py in the background and runs ansible-playbook with 1 and
+with 1 + TASKS tasks of smartcs_command, smartcs_config, smartcs_facts and
+smartcs_tty_command over network_cli. The tasks/second reported is TASKS
+divided by the difference of the two runs, so the start of ansible-playbook
+and the login to the simulator are not counted.
+ansible-playbook must be on PATH and the collection must be found through
+ANSIBLE_COLLECTIONS_PATH or --collections-path.
+
+Usage:
+    python bench_modules.py --tasks 20 --latency 0.01 --device-latency 0.05
+    python bench_modules.py --module smartcs_tty_command --max-delay 5 --early-completion
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import smartcs_sim  # noqa: E402
+
+
+INVENTORY = """[smartcs]
+sim ansible_host=127.0.0.1 ansible_port={port} ansible_user=admin ansible_password=admin
+[smartcs:vars]
+ansible_connection=ansible.netcommon.network_cli
+ansible_network_os=seiko.smartcs.smartcs
+ansible_network_cli_ssh_type=paramiko
+ansible_host_key_checking=false
+"""
+
+MODULE_TASKS = (
+    ('smartcs_command', {
+        'commands': ['show version', 'show ip'],
+    }),
+    ('smartcs_config', {
+        'lines': ['set tty 2 baud 19200', 'set portd tty 2 label TTY_02'],
+    }),
+    ('smartcs_facts', {
+        'gather_subset': 'all',
+    }),
+    ('smartcs_tty_command', {
+        'tty': '1-4',
+        'sendchar': ['__NL__', 'show version'],
+        'recvchar': ['SWITCH> '],
+        'initial_prompt': 'SWITCH> ',
+    }),
+)
+
+
+def free_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def start_simulator(args):
+    device = smartcs_sim.Device(args.latency, args.device_latency, max_delay=args.max_delay)
+    port = free_port()
+    ready = threading.Event()
+    server = threading.Thread(target=smartcs_sim.serve, args=(port, device), kwargs={'ready': ready})
+    server.daemon = True
+    server.start()
+    ready.wait()
+    return port
+
+
+def run_playbook(workdir, module, params, tasks):
+    playbook = [{
+        'hosts': 'smartcs',
+        'gather_facts': False,
+        'tasks': [{'seiko.smartcs.%s' % module: params}] * tasks,
+    }]
+    path = os.path.join(workdir, '%s_%d.yml' % (module, tasks))
+    with open(path, 'w') as f:
+        json.dump(playbook, f)
+
+    start = time.time()
+    proc = subprocess.Popen(['ansible-playbook', '-i', os.path.join(workdir, 'inventory'), path],
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output = proc.communicate()[0]
+    if proc.returncode != 0:
+        sys.stdout.write(output.decode('utf-8', 'replace'))
+        raise SystemExit('%s failed' % path)
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--tasks', type=int, default=20,
+                        help='tasks timed per module')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds the simulator adds to every CLI command')
+    parser.add_argument('--device-latency', type=float, default=0.0,
+                        help='seconds the simulated serial devices take to answer')
+    parser.add_argument('--max-delay', type=float, default=0.2,
+                        help='longest delay or timeout in seconds a simulated send really waits')
+    parser.add_argument('--module', action='append', choices=[name for name, params in MODULE_TASKS],
+                        help='module to benchmark, can be repeated (default: all)')
+    parser.add_argument('--early-completion', action='store_true',
+                        help='run smartcs_tty_command with early_completion and error_detect_on_sendchar exec')
+    parser.add_argument('--collections-path',
+                        help='value of ANSIBLE_COLLECTIONS_PATH for ansible-playbook')
+    args = parser.parse_args()
+
+    if args.collections_path:
+        os.environ['ANSIBLE_COLLECTIONS_PATH'] = args.collections_path
+    os.environ['ANSIBLE_HOST_KEY_CHECKING'] = 'False'
+    os.environ['ANSIBLE_PARAMIKO_HOST_KEY_AUTO_ADD'] = 'True'
+
+    port = start_simulator(args)
+    workdir = tempfile.mkdtemp(prefix='bench_modules_')
+    try:
+        with open(os.path.join(workdir, 'inventory'), 'w') as f:
+            f.write(INVENTORY.format(port=port))
+
+        print('latency / device latency  : %.3f s / %.3f s' % (args.latency, args.device_latency))
+        for module, params in MODULE_TASKS:
+            if args.module and module not in args.module:
+                continue
+            if module == 'smartcs_tty_command' and args.early_completion:
+                # early_completion requires error_detect_on_sendchar: exec
+                params = dict(params, early_completion=True, error_detect_on_sendchar='exec')
+            base_time = run_playbook(workdir, module, params, 1)
+            total_time = run_playbook(workdir, module, params, 1 + args.tasks)
+            task_time = max(total_time - base_time, 1e-6) / args.tasks
+            print('%-26s: %6.2f tasks/s  (%.3f s/task)' % (module, 1 / task_time, task_time))
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
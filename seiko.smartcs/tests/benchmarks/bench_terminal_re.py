@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2026 Seiko Solutions Inc. all rights reserved.
+#
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Benchmark of the error and prompt matching of the smartcs terminal plugin.
+
+Compares the terminal_stderr_re and terminal_stdout_re of TerminalModule with
+the lists of regexes they replace, after checking that both find the same
+errors and prompts on sample responses. network_cli reads the channel 256
+bytes at a time and only searches the last 256 bytes it has received, so the
+buffers default to that window and end with the error or prompt searched for.
+The collection must be importable as ansible_collections.seiko.smartcs.
+
+Usage:
+    python bench_terminal_re.py --sizes 256
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import re
+import timeit
+
+from ansible_collections.seiko.smartcs.plugins.terminal.smartcs import TerminalModule
+
+
+LEGACY_STDOUT_RE = [
+    re.compile(br"(^|\r|\n)[*]?\([0-9]{1,3}\)(\[[0-9:]{8}\])?[a-zA-Z0-9][a-zA-Z0-9-_.]{0,63}(?:[>#])[ ]$")
+]
+
+LEGACY_STDERR_RE = [
+    re.compile(br"(\r|\n)Error:[^:\s][\S ]+\(\d*\)(\r|\n)"),
+    re.compile(br"(^|\r|\n)incorrect password"),
+    re.compile(br".* <-- no such command"),
+    re.compile(br".* <-- unexpected character( string)?"),
+    re.compile(br".* <-- open quotation"),
+    re.compile(br".* <-- quotation over"),
+    re.compile(br".* <-- syntax error"),
+    re.compile(br".* <-- too many parameters"),
+    re.compile(br".* <-- not enough parameter"),
+    re.compile(br".* <-- ambiguous parameter")
+]
+
+SAMPLES = (
+    b'show version\r\nModel : NS-2250-48\r\n(0)NS-2250# ',
+    b'set tty 1 bad 1\r\nset tty 1 bad 1 <-- syntax error\r\n(0)NS-2250# ',
+    b'foo\r\nfoo <-- no such command\r\n(0)NS-2250# ',
+    b'x\r\nx <-- unexpected character string\r\n',
+    b'\r\nError: ttysendwaitset is running(1)\r\n(0)NS-2250# ',
+    b'incorrect password\r\n(0)NS-2250> ',
+    b'Error:(1)\r\n',
+    b'(0)NS-2250# set tty 1 baud 9600\r\n',
+    b'*(12)[12:00:00]NS-2250> ',
+    b'(0)NS-2250#',
+)
+
+CONSOLE_LINE = b'Jan  1 00:00:00 SWITCH kernel: eth0: link up, 1000Mbps, full-duplex <- lpa 0x45e1\r\n'
+
+
+def matches(regexes, data):
+    return any(regex.search(data) for regex in regexes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256],
+                        help='sizes of the buffers in bytes')
+    parser.add_argument('--number', type=int, default=100000,
+                        help='searches timed per buffer')
+    args = parser.parse_args()
+
+    for sample in SAMPLES:
+        for legacy, current in ((LEGACY_STDERR_RE, TerminalModule.terminal_stderr_re),
+                                (LEGACY_STDOUT_RE, TerminalModule.terminal_stdout_re)):
+            if matches(legacy, sample) != matches(current, sample):
+                raise SystemExit('the regexes disagree on %r' % sample)
+
+    print('%-10s %-16s %12s %12s %8s' % ('bytes', 'buffer', 'legacy', 'current', 'speedup'))
+    for size in args.sizes:
+        console = CONSOLE_LINE * (size // len(CONSOLE_LINE) + 1)
+        buffers = (
+            ('stderr/clean', LEGACY_STDERR_RE, TerminalModule.terminal_stderr_re, console),
+            ('stderr/error', LEGACY_STDERR_RE, TerminalModule.terminal_stderr_re,
+             console + b'\r\nfoo <-- no such command\r\n'),
+            ('stdout/prompt', LEGACY_STDOUT_RE, TerminalModule.terminal_stdout_re,
+             console + b'(0)NS-2250# '),
+        )
+        for name, legacy, current, data in buffers:
+            data = data[-size:]
+            if matches(legacy, data) != matches(current, data):
+                raise SystemExit('the regexes disagree on the %s buffer' % name)
+            legacy_time = timeit.timeit(lambda: matches(legacy, data), number=args.number) / args.number
+            current_time = timeit.timeit(lambda: matches(current, data), number=args.number) / args.number
+            print('%-10d %-16s %10.2fus %10.2fus %7.1fx' % (size, name, legacy_time * 1e6, current_time * 1e6,
+                                                            legacy_time / current_time))
+
+
+if __name__ == '__main__':
+    main()
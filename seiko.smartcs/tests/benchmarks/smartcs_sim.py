@@ -0,0 +1,440 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2026 Seiko Solutions Inc. all rights reserved.
+#
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Local stand-in for a SmartCS CLI.
+
+The simulator serves the SmartCS command line over SSH (paramiko) so the
+collection can be exercised without an NS-2250.  It reproduces the prompt
+format matched by TerminalModule.terminal_stdout_re, the interactive
+``sendstr>``/``waitstr>``/``waitregex>``/``errorregex>`` input prompts, the
+``terminal ttymanage`` settings and the ``ttysend``/``ttysendwaitset``
+semantics against fake serial devices attached to each TTY.
+
+Usage:
+    python smartcs_sim.py --port 10022 --latency 0.01 --device-latency 0.05
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import logging
+import re
+import socket
+import threading
+import time
+
+import paramiko
+
+
+# Clients that drop the connection are expected, keep paramiko quiet about it
+logging.getLogger('paramiko').addHandler(logging.NullHandler())
+
+HOSTNAME = 'NS-2250'
+TTY_MAX = 48
+
+SHOW_VERSION = """
+Model                 : NS-2250-48
+Serial No.            : 00012345
+Ether Address(eth1)   : 00:80:15:41:a7:a4
+Ether Address(eth2)   : 00:80:15:41:a7:a5
+System                : System Software Ver 3.1.1
+Main System           : Ver 3.1.1
+Backup System         : Ver 3.0.1
+BootROM               : Ver 1.6
+Boot Config           : internal startup1
+"""
+
+SHOW_IP = """
+Hostname         : {hostname}
+IPaddress(eth1)  : 192.168.0.1/255.255.255.0
+IPaddress(eth2)  : none
+IPaddress(bond1) : none
+"""
+
+IPINTERFACE = [
+    ' lo         up      16436 static  127.0.0.1/255.0.0.0',
+    '                    static  ::1/128',
+    ' eth1       up      1500  static  192.168.0.1/255.255.255.0',
+    '                    static  2001:db8::1/64',
+    '                    link    fe80::280:15ff:fe41:a7a4/64',
+    ' eth2       down    1500  static  192.168.1.1/255.255.255.0',
+    '                    link    fe80::280:15ff:fe41:a7a5/64',
+]
+
+PORTD_FMT = '{tty:>3}  {label:<16} 1  3  both  rw    -     off  {opt:<8}  cr   none      -'
+PORTD_HEADER = 'tty  Label            RW RO Mode  RW    Auth  Tstamp Option    NL   Option    RNL\n'
+TTY_HEADER = '\ntty  Baud    Bit  Parity  Stop  Flow  Detect\n'
+TTY_FMT = '{tty:>3}  {baud:<7} 8  none  1  {flow:<4}  on'
+
+CONFIG_SECTIONS = ('system', 'ip', 'user', 'portd', 'tty', 'terminal')
+
+
+class FakeDevice(object):
+    """ Console attached to a single SmartCS TTY """
+
+    def __init__(self, tty, latency, prompt='SWITCH> '):
+        self.tty = tty
+        self.latency = latency
+        self.prompt = prompt
+
+    def respond(self, data):
+        text = data.strip()
+        if text == 'show version':
+            body = 'SWITCH Software Version 1.0 (tty %d)\r\n' % self.tty
+        elif text:
+            body = '%s\r\n' % text
+        else:
+            body = ''
+        return '%s\r\n%s%s' % (text, body, self.prompt)
+
+
+class Device(object):
+    """ State shared by every session on the simulated SmartCS """
+
+    def __init__(self, latency=0.0, device_latency=0.0, ttys=TTY_MAX, max_delay=0.2):
+        self.latency = latency
+        self.max_delay = max_delay
+        self.hostname = HOSTNAME
+        self.lock = threading.Lock()
+        self.running = self._default_config()
+        self.startup = list(self.running)
+        self.devices = dict(
+            (tty, FakeDevice(tty, device_latency)) for tty in range(1, ttys + 1)
+        )
+        self.commands = 0
+
+    def _default_config(self):
+        lines = ['set hostname %s' % self.hostname,
+                 'set ipaddr eth1 192.168.0.1/24',
+                 'create user user1 group normal uid 100 password']
+        for tty in range(1, TTY_MAX + 1):
+            lines.append('set portd tty %d label TTY_%02d' % (tty, tty))
+            lines.append('set tty %d baud 9600' % tty)
+        return lines
+
+    def tty_setting(self, tty, name, default):
+        prefix = 'set tty %d %s ' % (tty, name)
+        for line in self.running:
+            if line.startswith(prefix):
+                return line[len(prefix):]
+        return default
+
+    def section(self, name):
+        tokens = {
+            'system': ('set hostname',),
+            'ip': ('set ipaddr',),
+            'user': ('create user',),
+            'portd': ('set portd',),
+            'tty': ('set tty',),
+        }.get(name, ())
+        return [line for line in self.running if line.startswith(tokens)]
+
+
+class Session(object):
+    """ One interactive CLI session on an SSH channel """
+
+    ERROR_TOKENS = ('no such command', 'syntax error')
+
+    def __init__(self, device, channel, root=True):
+        self.device = device
+        self.chan = channel
+        self.root = root
+        self.ttymanage = dict(nl='cr', timeout=10, after_error='cancel', tty=1,
+                              waitstr={}, waitregex={}, errorregex={})
+        self.buffer = ''
+
+    @property
+    def prompt(self):
+        return '(0)%s%s ' % (self.device.hostname, '#' if self.root else '>')
+
+    def write(self, text):
+        self.chan.sendall(text.replace('\n', '\r\n').replace('\r\r\n', '\r\n'))
+
+    def readline(self):
+        while '\r' not in self.buffer and '\n' not in self.buffer:
+            data = self.chan.recv(4096)
+            if not data:
+                raise EOFError()
+            self.buffer += data.decode('utf-8', 'replace')
+        match = re.search(r'\r\n|\r|\n', self.buffer)
+        line = self.buffer[:match.start()]
+        self.buffer = self.buffer[match.end():]
+        return line
+
+    def interact(self, prompt):
+        self.write(prompt)
+        line = self.readline()
+        self.write(line + '\n')
+        return line
+
+    def run(self):
+        self.write('\r\n' + self.prompt)
+        try:
+            while True:
+                line = self.readline()
+                self.write(line + '\n')
+                if self.device.latency:
+                    time.sleep(self.device.latency)
+                with self.device.lock:
+                    self.device.commands += 1
+                out = self.execute(line.strip())
+                if out is None:
+                    break
+                if out:
+                    self.write(out.rstrip('\n') + '\n')
+                self.write(self.prompt)
+        except (EOFError, socket.error):
+            pass
+        finally:
+            self.chan.close()
+
+    def execute(self, line):
+        if not line:
+            return ''
+        if line in ('exit', 'logout'):
+            return None
+
+        words = line.split()
+        handler = getattr(self, 'cmd_%s' % words[0], None)
+        if handler is None:
+            return '%s <-- no such command' % line
+        return handler(line, words)
+
+    def cmd_terminal(self, line, words):
+        if len(words) > 1 and words[1] == 'ttymanage':
+            return self.ttymanage_setting(line, words[2:])
+        return ''
+
+    def ttymanage_setting(self, line, words):
+        if len(words) >= 2 and words[0] in ('nl', 'after_error'):
+            self.ttymanage[words[0]] = words[1]
+        elif len(words) >= 2 and words[0] in ('timeout', 'tty'):
+            self.ttymanage[words[0]] = int(words[1])
+        elif len(words) == 3 and words[0] in ('waitstr', 'waitregex', 'errorregex'):
+            value = self.interact('%s> ' % words[0])
+            if value:
+                self.ttymanage[words[0]][int(words[1])] = value
+            else:
+                self.ttymanage[words[0]].pop(int(words[1]), None)
+        else:
+            return '%s <-- syntax error' % line
+        return ''
+
+    def cmd_su(self, line, words):
+        # The password is not echoed
+        self.write('Password: ')
+        self.readline()
+        self.write('\n')
+        self.root = True
+        return ''
+
+    def cmd_show(self, line, words):
+        dev = self.device
+        rest = ' '.join(words[1:])
+        if rest == 'version':
+            return SHOW_VERSION
+        if rest == 'ip':
+            return SHOW_IP.format(hostname=dev.hostname)
+        if rest.startswith('ipinterface'):
+            name = words[2] if len(words) > 2 else None
+            lines = [' Interface  Status  MTU   Type    IPaddress/Netmask(Prefixlen)']
+            current = None
+            for entry in IPINTERFACE:
+                if not entry.startswith('                    '):
+                    current = entry.split()[0]
+                if name is None or name == current:
+                    lines.append(entry)
+            return '\n'.join(lines)
+        if rest == 'portd tty':
+            return PORTD_HEADER + '\n'.join(
+                PORTD_FMT.format(tty=tty, label='TTY_%02d' % tty, opt='-')
+                for tty in sorted(dev.devices)
+            )
+        if rest == 'tty':
+            return TTY_HEADER + '\n'.join(
+                TTY_FMT.format(tty=tty, baud=dev.tty_setting(tty, 'baud', '9600'),
+                               flow=dev.tty_setting(tty, 'flow', 'none'))
+                for tty in sorted(dev.devices)
+            )
+        if rest == 'config running ?':
+            return '\n'.join('  %-12s Show %s configuration' % (s, s)
+                             for s in ('all',) + CONFIG_SECTIONS)
+        if rest.startswith('config running'):
+            section = words[3] if len(words) > 3 else None
+            if section in CONFIG_SECTIONS:
+                return '\n'.join(dev.section(section))
+            # the device prints progress dots before the running configuration
+            return '.' * 10 + '\n' + '\n'.join(dev.running)
+        if rest.startswith('config startup'):
+            return '=== show internal startup1 ===\n' + '\n'.join(dev.startup)
+        if rest.startswith('terminal ttymanage'):
+            return '\n'.join('%s : %s' % item for item in sorted(self.ttymanage.items()))
+        return '%s <-- no such command' % line
+
+    def cmd_write(self, line, words):
+        answer = self.interact('Do you really want to write internal startup1 [y/n] ? ')
+        if answer.strip() == 'y':
+            self.device.startup = list(self.device.running)
+        return ''
+
+    def _configure(self, line, words):
+        if len(words) < 3:
+            return '%s <-- not enough parameter' % line
+        if 'bad' in words:
+            return '%s <-- syntax error' % line
+        dev = self.device
+        with dev.lock:
+            prefix = ' '.join(words[:-1])
+            dev.running = [c for c in dev.running if not c.startswith(prefix + ' ')]
+            dev.running.append(line)
+            if words[:2] == ['set', 'hostname']:
+                dev.hostname = words[2]
+        return ''
+
+    cmd_set = _configure
+    cmd_create = _configure
+
+    def cmd_unset(self, line, words):
+        with self.device.lock:
+            target = 'set ' + ' '.join(words[1:])
+            self.device.running = [c for c in self.device.running if not c.startswith(target)]
+        return ''
+
+    def _parse_send(self, words):
+        opts = dict(tty=None, delay=0, timeout=None, nl=self.ttymanage['nl'])
+        idx = 1
+        mode = None
+        while idx < len(words):
+            word = words[idx]
+            if word in ('tty', 'delay', 'timeout', 'nl', 'ctl_char', 'hex'):
+                opts[word] = words[idx + 1] if idx + 1 < len(words) else None
+                idx += 2
+                continue
+            if word in ('input', 'nlonly'):
+                mode = word
+            idx += 1
+        return opts, mode
+
+    def _ttylist(self, value):
+        ttys = []
+        for elem in str(value).split(','):
+            bounds = elem.split('-')
+            ttys.extend(range(int(bounds[0]), int(bounds[-1]) + 1))
+        return [self.device.devices[tty] for tty in ttys]
+
+    def _send(self, line, words, wait):
+        opts, mode = self._parse_send(words)
+        try:
+            devices = self._ttylist(opts['tty'])
+        except (TypeError, ValueError, KeyError):
+            return '%s <-- syntax error' % line
+
+        if mode == 'input':
+            data = self.interact('sendstr> ')
+        elif opts.get('hex'):
+            data = opts['hex'].strip('"')
+        else:
+            data = ''
+
+        if devices[0].latency:
+            time.sleep(devices[0].latency)
+        response = '\n'.join(device.respond(data) for device in devices)
+
+        if wait:
+            patterns = [re.escape(s) for s in self.ttymanage['waitstr'].values()]
+            patterns += list(self.ttymanage['waitregex'].values())
+            if patterns and not any(re.search(p, response) for p in patterns):
+                if opts['timeout']:
+                    time.sleep(min(float(opts['timeout']), self.device.max_delay))
+                return '%s\nError:: Timeout' % response
+            for regex in self.ttymanage['errorregex'].values():
+                if re.search(regex, response):
+                    return '%s\nError:: Matched (%s)' % (response, regex)
+        elif opts['delay']:
+            time.sleep(min(float(opts['delay']), self.device.max_delay))
+        return response
+
+    def cmd_ttysend(self, line, words):
+        return self._send(line, words, wait=False)
+
+    def cmd_ttysendwaitset(self, line, words):
+        return self._send(line, words, wait=True)
+
+
+class Server(paramiko.ServerInterface):
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_shell_request(self, channel):
+        return True
+
+    def check_channel_pty_request(self, channel, term, width, height,
+                                  pixelwidth, pixelheight, modes):
+        return True
+
+
+def serve_client(client, device, host_key):
+    transport = paramiko.Transport(client)
+    transport.add_server_key(host_key)
+    transport.start_server(server=Server())
+    channel = transport.accept(30)
+    if channel is None:
+        transport.close()
+        return
+    try:
+        # The user "user" logs in without root privileges and has to su
+        Session(device, channel, root=transport.get_username() != 'user').run()
+    except (EOFError, socket.error, paramiko.SSHException):
+        # The client went away while the session was answering it
+        pass
+    transport.close()
+
+
+def serve(port, device, host='127.0.0.1', ready=None):
+    host_key = paramiko.RSAKey.generate(2048)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(16)
+    if ready is not None:
+        ready.set()
+    while True:
+        client, addr = sock.accept()
+        worker = threading.Thread(target=serve_client, args=(client, device, host_key))
+        worker.daemon = True
+        worker.start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=10022)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds added to every CLI command')
+    parser.add_argument('--device-latency', type=float, default=0.0,
+                        help='seconds the attached serial devices take to answer')
+    parser.add_argument('--ttys', type=int, default=TTY_MAX)
+    parser.add_argument('--max-delay', type=float, default=0.2,
+                        help='longest delay or timeout in seconds a send really waits')
+    args = parser.parse_args()
+
+    device = Device(args.latency, args.device_latency, args.ttys, args.max_delay)
+    serve(args.port, device, args.host)
+
+
+if __name__ == '__main__':
+    main()
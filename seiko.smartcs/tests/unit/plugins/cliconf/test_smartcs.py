@@ -0,0 +1,261 @@
+#
+# Copyright (c) 2026 Seiko Solutions Inc. all rights reserved.
+#
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Unit tests of the smartcs cliconf plugin
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible_collections.seiko.smartcs.plugins.cliconf.smartcs import Cliconf
+
+
+PROMPT = b'(0)NS-2250# '
+
+
+class FakeConnection(object):
+    """ A shell that answers the commands from canned responses, and returns
+    a canned output once all lines of a batch are sent
+    """
+
+    def __init__(self, output=b'', options=None, responses=None):
+        self.output = output
+        self.options = dict(options or {})
+        self.responses = dict(responses or {})
+        self.sent = list()
+        self._ssh_shell = object()
+
+    def get_option(self, option):
+        return self.options.get(option)
+
+    def set_option(self, option, value):
+        self.options[option] = value
+
+    def get_prompt(self):
+        return PROMPT
+
+    def send(self, command, sendonly=False, **kwargs):
+        self.sent.append(command)
+        return self.responses.get(command, b'')
+
+    def receive(self, strip_prompt=True):
+        output, self.output = self.output, b''
+        return output
+
+    def queue_message(self, level, message):
+        pass
+
+
+def canned_output(*responses):
+    # Each response starts with the echo of its line and ends at the prompt
+    return b''.join(response + b'\r\n' + PROMPT for response in responses)
+
+
+def send_config_batch(commands, output, options=None):
+    connection = FakeConnection(output, options)
+    return Cliconf(connection)._send_config_batch(commands), connection
+
+
+def test_batch_output_is_split_per_line():
+    commands = ['set tty 1 baud 9600', 'set tty 2 baud 9600', 'show tty 2']
+    output = canned_output(b'set tty 1 baud 9600', b'set tty 2 baud 9600', b'show tty 2\r\ntty 2 9600')
+
+    results, connection = send_config_batch(commands, output)
+    assert results == ['', '', 'tty 2 9600']
+    assert connection.sent == [b'set tty 1 baud 9600', b'set tty 2 baud 9600', b'show tty 2']
+
+
+def test_batch_error_on_a_middle_line_is_raised():
+    commands = ['set tty 1 baud 9600', 'set tty 2 baud 1', 'set tty 3 baud 9600']
+    output = canned_output(b'set tty 1 baud 9600',
+                           b'set tty 2 baud 1\r\nset tty 2 baud 1 <-- syntax error',
+                           b'set tty 3 baud 9600')
+
+    with pytest.raises(AnsibleConnectionFailure) as exc:
+        send_config_batch(commands, output)
+    assert str(exc.value) == 'set tty 2 baud 1 <-- syntax error'
+
+
+def test_batch_with_an_echo_that_does_not_match_is_not_split():
+    commands = ['set tty 1 baud 9600', 'set tty 2 baud 9600']
+    output = canned_output(b'set tty 1 baud 9600', b'set tty 3 baud 9600')
+
+    results, connection = send_config_batch(commands, output)
+    assert results is None
+
+
+def test_batch_with_a_wrapped_line_is_not_split():
+    label = 'x' * 64
+    commands = ['set tty 1 baud 9600', 'set tty 2 label "%s"' % label]
+    output = canned_output(b'set tty 1 baud 9600', b'set tty 2 label "' + label[:32].encode() + b'\r\n' + label[32:].encode() + b'"')
+
+    results, connection = send_config_batch(commands, output)
+    assert results is None
+
+
+def test_batch_that_is_not_split_is_still_checked_for_errors():
+    label = 'x' * 64
+    commands = ['set tty 1 label "%s"' % label, 'set tty 2 baud 1']
+    output = canned_output(b'set tty 1 label "' + label[:32].encode() + b'\r\n' + label[32:].encode() + b'"',
+                           b'set tty 2 baud 1\r\nset tty 2 baud 1 <-- syntax error')
+
+    with pytest.raises(AnsibleConnectionFailure):
+        send_config_batch(commands, output)
+
+
+def test_batch_is_checked_against_the_terminal_stderr_re_option():
+    stderr_re = [{'pattern': 'custom failure'}]
+    commands = ['set tty 1 baud 9600', 'set tty 2 baud 1']
+
+    # The option replaces the regexes of the terminal plugin
+    output = canned_output(b'set tty 1 baud 9600', b'set tty 2 baud 1\r\nset tty 2 baud 1 <-- syntax error')
+    results, connection = send_config_batch(commands, output, {'terminal_stderr_re': stderr_re})
+    assert results == ['', 'set tty 2 baud 1 <-- syntax error']
+    assert connection.options['terminal_stderr_re'] == stderr_re
+
+    output = canned_output(b'set tty 1 baud 9600', b'set tty 2 baud 1\r\ncustom failure')
+    with pytest.raises(AnsibleConnectionFailure) as exc:
+        send_config_batch(commands, output, {'terminal_stderr_re': stderr_re})
+    assert str(exc.value) == 'custom failure'
+
+
+def test_batch_option_flags_are_compiled():
+    stderr_re = [{'pattern': 'custom failure', 'flags': 're.I'}]
+    commands = ['set tty 1 baud 9600', 'set tty 2 baud 1']
+    output = canned_output(b'set tty 1 baud 9600', b'set tty 2 baud 1\r\nCUSTOM FAILURE')
+
+    with pytest.raises(AnsibleConnectionFailure):
+        send_config_batch(commands, output, {'terminal_stderr_re': stderr_re})
+
+
+def cliconf(config_cache=True, responses=None):
+    connection = FakeConnection(responses=responses)
+    plugin = Cliconf(connection)
+    plugin._options.update(config_cache=config_cache, config_batch_size=1)
+    return plugin, connection
+
+
+def test_ttymanage_settings_already_applied_are_not_sent_again():
+    plugin, connection = cliconf()
+    settings = ['terminal ttymanage nl cr', 'terminal ttymanage timeout 10']
+
+    plugin.run_tty_script(settings=settings)
+    assert connection.sent == [b'terminal ttymanage nl cr', b'terminal ttymanage timeout 10']
+
+    del connection.sent[:]
+    plugin.run_tty_script(settings=['terminal ttymanage nl cr', 'terminal ttymanage timeout 20'])
+    assert connection.sent == [b'terminal ttymanage timeout 20']
+
+
+def test_ttymanage_wait_entries_are_compared_by_answer():
+    plugin, connection = cliconf()
+    waitstr = {'command': 'terminal ttymanage waitstr 1', 'prompt': 'input waitstr> ', 'answer': 'login:'}
+
+    plugin.run_tty_script(settings=[waitstr])
+    plugin.run_tty_script(settings=[waitstr])
+    assert connection.sent == [b'terminal ttymanage waitstr 1']
+
+    del connection.sent[:]
+    plugin.run_tty_script(settings=[dict(waitstr, answer='Password:')])
+    assert connection.sent == [b'terminal ttymanage waitstr 1']
+
+
+def test_ttymanage_wait_entries_are_not_cleared_on_a_new_session():
+    plugin, connection = cliconf()
+    clear = {'command': 'terminal ttymanage waitstr 1', 'prompt': 'input waitstr> ', 'answer': ''}
+
+    # A new session has no wait entry to clear
+    plugin.run_tty_script(settings=[clear])
+    assert connection.sent == []
+
+    waitstr = dict(clear, answer='login:')
+    plugin.run_tty_script(settings=[waitstr])
+    plugin.run_tty_script(settings=[clear])
+    assert connection.sent == [b'terminal ttymanage waitstr 1'] * 2
+
+
+def test_ttymanage_settings_sent_by_run_commands_reset_the_delta():
+    plugin, connection = cliconf()
+    clear = {'command': 'terminal ttymanage waitstr 1', 'prompt': 'input waitstr> ', 'answer': ''}
+
+    plugin.run_tty_script(settings=['terminal ttymanage nl cr'])
+    plugin.run_commands(['terminal ttymanage waitstr 1'])
+
+    # The entries set through run_commands are unknown, so everything is sent
+    del connection.sent[:]
+    plugin.run_tty_script(settings=['terminal ttymanage nl cr', clear])
+    assert connection.sent == [b'terminal ttymanage nl cr', b'terminal ttymanage waitstr 1']
+
+
+def test_ttymanage_settings_are_sent_again_on_a_new_shell():
+    plugin, connection = cliconf()
+
+    plugin.run_tty_script(settings=['terminal ttymanage nl cr'])
+    connection._ssh_shell = object()
+    plugin.run_tty_script(settings=['terminal ttymanage nl cr'])
+    assert connection.sent == [b'terminal ttymanage nl cr'] * 2
+
+
+def test_config_is_cached_until_a_command_changes_it():
+    plugin, connection = cliconf(responses={b'show config running': b'set tty 1 baud 9600'})
+
+    assert plugin.get_config() == b'set tty 1 baud 9600'
+    plugin.run_commands(['show version', 'terminal ttymanage nl cr'])
+    assert plugin.get_config() == b'set tty 1 baud 9600'
+    assert connection.sent.count(b'show config running') == 1
+
+    plugin.run_commands(['set tty 1 baud 19200'])
+    plugin.get_config()
+    assert connection.sent.count(b'show config running') == 2
+
+
+@pytest.mark.parametrize('edit', [
+    lambda plugin: plugin.edit_config(['set tty 1 baud 19200']),
+    lambda plugin: plugin.edit_banner('{"set motd": "hello"}'),
+    lambda plugin: plugin.edit_macro(['macro line']),
+])
+def test_config_cache_is_invalidated_by_the_edit_methods(edit, monkeypatch):
+    plugin, connection = cliconf()
+    monkeypatch.setattr(plugin, '_wait_for_echo', lambda command: None)
+
+    plugin.get_config()
+    edit(plugin)
+    plugin.get_config()
+    assert connection.sent.count(b'show config running') == 2
+
+
+def test_config_cache_is_dropped_on_a_new_shell():
+    plugin, connection = cliconf()
+
+    plugin.get_config()
+    connection._ssh_shell = object()
+    plugin.get_config()
+    assert connection.sent.count(b'show config running') == 2
+
+
+def test_config_is_not_cached_when_config_cache_is_disabled():
+    plugin, connection = cliconf(config_cache=False)
+
+    plugin.get_config()
+    plugin.get_config()
+    assert connection.sent.count(b'show config running') == 2
+
+
+def test_startup_config_digest_is_cached_until_write():
+    plugin, connection = cliconf(responses={b'show config startup': b'=== show internal startup1 ===\nset tty 1 baud 9600'})
+
+    digest = plugin.get_config_digest('startup')
+    assert plugin.get_config_digest('startup') == digest
+    plugin.edit_config(['set tty 1 baud 19200'])
+    assert plugin.get_config_digest('startup') == digest
+    assert connection.sent.count(b'show config startup') == 1
+
+    plugin.run_commands(['write'])
+    plugin.get_config_digest('startup')
+    assert connection.sent.count(b'show config startup') == 2
@@ -0,0 +1,145 @@
+#
+# Copyright (c) 2026 Seiko Solutions Inc. all rights reserved.
+#
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Unit tests of the parsers of the legacy facts
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.facts.legacy.base import (
+    PORTD_TTY_RE,
+    SHOW_IP_FIELDS,
+    SHOW_VERSION_FIELDS,
+    TTY_RE,
+    parse_fields,
+    parse_ipinterface,
+    parse_tty_table,
+)
+
+
+SHOW_VERSION = """Model                 : NS-2250-48
+Serial No.            : 00012345
+System                : System Software Ver 3.1.1
+Main System           : Ver 3.1.1
+Backup System         : Ver 3.0.1
+BootROM               : Ver 1.6
+Boot Config           : internal startup1
+"""
+
+SHOW_IP = """Hostname         : NS-2250
+IPaddress(eth1)  : 192.168.0.1/255.255.255.0
+IPaddress(eth2)  : none
+IPaddress(bond1) : none
+"""
+
+SHOW_IPINTERFACE = """ Interface  Status  MTU   Type    IPaddress/Netmask(Prefixlen)
+ eth1       up      1500  static  192.168.0.1/255.255.255.0
+                    static  2001:db8::1/64
+                    link    fe80::280:15ff:fe41:a7a4/64
+ eth2       down    1500  link    fe80::280:15ff:fe41:a7a5/64
+"""
+
+SHOW_PORTD_TTY = """tty  Label            RW RO Mode  RW    Auth  Tstamp Option    NL   Option    RNL
+  1  TTY_01           1  3  both  rw    -     off  -         cr   none      -
+  2  TTY_02           1  3  both  rw    -     off  -         cr   none      -
+"""
+
+SHOW_TTY = """
+tty  Baud    Bit  Parity  Stop  Flow  Detect
+  1  9600    8  none  1  none  on
+  2  115200  7  even  2  xon   off
+ 10  9600    8  none  1  rts   on
+"""
+
+
+def test_parse_fields_show_version():
+    assert parse_fields(SHOW_VERSION, SHOW_VERSION_FIELDS) == dict(
+        version='3.1.1',
+        serialnum='00012345',
+        model='NS-2250-48',
+        mainsystem='3.1.1',
+        backupsystem='3.0.1',
+        bootrom='1.6',
+        bootconfig='internal startup1',
+    )
+
+
+def test_parse_fields_show_ip():
+    assert parse_fields(SHOW_IP, SHOW_IP_FIELDS) == dict(
+        hostname='NS-2250',
+        eth1='192.168.0.1/255.255.255.0',
+        eth2='none',
+        bond1='none',
+    )
+
+
+def test_parse_fields_missing_and_mismatched_values():
+    data = 'Model                 : NS-2250-48\nBootROM               : 1.6\n'
+    facts = parse_fields(data, SHOW_VERSION_FIELDS)
+
+    assert facts['model'] == 'NS-2250-48'
+    # The value does not start with "Ver "
+    assert facts['bootrom'] is None
+    assert facts['version'] is None
+
+
+def test_parse_fields_keeps_the_first_line_of_a_label():
+    data = 'Hostname         : first\nHostname         : second\n'
+    assert parse_fields(data, SHOW_IP_FIELDS)['hostname'] == 'first'
+
+
+def test_parse_fields_empty_values():
+    data = 'Hostname         : \n'
+    assert parse_fields(data, SHOW_IP_FIELDS)['hostname'] == ''
+    assert parse_fields(data, SHOW_IP_FIELDS, empty=False)['hostname'] is None
+
+
+def test_parse_ipinterface():
+    interfaces = parse_ipinterface(SHOW_IPINTERFACE)
+
+    assert interfaces == dict(
+        eth1=dict(
+            v4_ip='192.168.0.1',
+            v4_mask='255.255.255.0',
+            v6_ip='2001:db8::1',
+            v6_mask='64',
+            v6_linklocal_ip='fe80::280:15ff:fe41:a7a4',
+            v6_linklocal_mask='64',
+        ),
+        eth2=dict(
+            v4_ip=None,
+            v4_mask=None,
+            v6_ip=None,
+            v6_mask=None,
+            v6_linklocal_ip='fe80::280:15ff:fe41:a7a5',
+            v6_linklocal_mask='64',
+        ),
+    )
+
+
+def test_parse_ipinterface_no_interface():
+    assert parse_ipinterface('') == dict()
+
+
+def test_parse_tty_table():
+    table = parse_tty_table(SHOW_TTY, TTY_RE)
+
+    assert sorted(table) == [1, 2, 10]
+    assert table[2].group(2).strip() == '115200'
+    assert table[2].group(3, 4, 5, 6, 7) == ('7', 'even', '2', 'xon', 'off')
+    assert table[10].group(6) == 'rts'
+
+
+def test_parse_tty_table_selected_ttys():
+    assert sorted(parse_tty_table(SHOW_TTY, TTY_RE, ttys={2, 3})) == [2]
+
+
+def test_parse_tty_table_portd():
+    table = parse_tty_table(SHOW_PORTD_TTY, PORTD_TTY_RE)
+
+    assert sorted(table) == [1, 2]
+    assert table[1].group(2).strip() == 'TTY_01'
@@ -0,0 +1,100 @@
+#
+# Copyright (c) 2026 Seiko Solutions Inc. all rights reserved.
+#
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Unit tests of the configuration helpers of module_utils smartcs
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.config import (
+    NetworkConfig,
+    dumps,
+)
+from ansible_collections.seiko.smartcs.plugins.module_utils.network.smartcs.smartcs import (
+    compareble_config,
+    config_digest,
+    diff_flat_config,
+)
+
+
+RUNNING = '\n'.join([
+    '..........',
+    'set hostname NS-2250',
+    'set tty 1 baud 9600',
+    'set tty 2 baud 9600',
+    'set tty 2 label "TTY_02"',
+    'create user user1 group normal uid 100 encrypt_password $1$abc',
+    'enable telnetd',
+])
+
+CANDIDATES = [
+    '',
+    'set tty 1 baud 9600',
+    'set tty 1 baud 19200\nset tty 2 baud 9600',
+    'set tty 3 baud 9600\nset tty 3 baud 9600',
+    'set tty 1 baud 9600  \n  \nset tty 4 baud 9600',
+    '! comment\nset tty 4 baud 9600\n# comment',
+    'set tty 2 label "TTY_02"\nset tty 2 label "TTY 02"',
+    'set hostname NS-2250\r\nenable sshd',
+]
+
+
+def legacy_diff(candidate, running):
+    candidate_obj = NetworkConfig(indent=1)
+    candidate_obj.load(candidate)
+    if running is None:
+        configdiffobjs = candidate_obj.items
+    else:
+        running_obj = NetworkConfig(indent=1, contents=running, ignore_lines=None)
+        configdiffobjs = candidate_obj.difference(running_obj, match='line')
+    return dumps(configdiffobjs, 'commands') if configdiffobjs else ''
+
+
+@pytest.mark.parametrize('candidate', CANDIDATES)
+@pytest.mark.parametrize('running', [RUNNING, '', None])
+def test_diff_flat_config_returns_the_lines_of_network_config_difference(candidate, running):
+    assert '\n'.join(diff_flat_config(candidate, running)) == legacy_diff(candidate, running)
+
+
+@pytest.mark.parametrize('candidate, running', [
+    ('set tty 1 baud 9600\n set tty 2 baud 9600', RUNNING),
+    ('set tty 1 baud 9600', RUNNING + '\n set tty 2 baud 9600'),
+    ('\tset tty 1 baud 9600', None),
+])
+def test_diff_flat_config_leaves_indented_configurations_to_network_config(candidate, running):
+    assert diff_flat_config(candidate, running) is None
+
+
+STARTUP = RUNNING.replace('..........', '=== show internal startup1 ===')
+
+
+def legacy_equal(running, startup):
+    running_config = NetworkConfig(indent=1, contents=running, ignore_lines=None)
+    startup_config = NetworkConfig(indent=1, contents=startup, ignore_lines=None)
+    running_config_compareble, startup_config_compareble = compareble_config(running_config, startup_config)
+    return running_config_compareble == startup_config_compareble
+
+
+@pytest.mark.parametrize('running, startup', [
+    (RUNNING, STARTUP),
+    (RUNNING, STARTUP.replace('startup1', 'startup4').replace('internal', 'external')),
+    (RUNNING, STARTUP + '\n'),
+    (RUNNING + '\n\n', STARTUP),
+    (RUNNING, STARTUP.replace('\n', '\r\n')),
+    (RUNNING, STARTUP + '\n! comment'),
+    (RUNNING, STARTUP.replace('baud 9600', 'baud 19200', 1)),
+    (RUNNING, STARTUP + '\nset tty 3 baud 9600'),
+    (RUNNING, STARTUP.replace('set hostname', ' set hostname')),
+    (RUNNING, STARTUP.replace('=== show internal startup1 ===\n', '')),
+    (RUNNING.replace('..........\n', ''), STARTUP),
+    ('', '=== show internal startup1 ==='),
+])
+def test_config_digest_compares_as_compareble_config(running, startup):
+    equal = config_digest(running, 'running') == config_digest(startup, 'startup')
+    assert equal == legacy_equal(running, startup)
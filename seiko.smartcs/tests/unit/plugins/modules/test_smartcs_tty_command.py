@@ -0,0 +1,117 @@
+#
+# Copyright (c) 2026 Seiko Solutions Inc. all rights reserved.
+#
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Unit tests of the timeout profile and pacing arithmetic of smartcs_tty_command
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.seiko.smartcs.plugins.modules.smartcs_tty_command import (
+    PROFILE_SAMPLES,
+    chars_per_second,
+    profile_key,
+    profile_timeout,
+    record_profile,
+    sendchar_size,
+)
+
+
+class FakeModule(object):
+
+    def __init__(self, **params):
+        self.params = dict(cmd_timeout=10)
+        self.params.update(params)
+
+    def fail_json(self, **kwargs):
+        raise AssertionError(kwargs['msg'])
+
+
+def timing(device_time, tty=None):
+    item = dict(command='ttysendwaitset', device_time=device_time, bytes=0)
+    if tty is not None:
+        item['tty'] = tty
+    return item
+
+
+@pytest.mark.parametrize('samples', [None, [], [0.5] * 4])
+def test_profile_timeout_needs_enough_samples(samples):
+    assert profile_timeout(samples, 10) is None
+
+
+def test_profile_timeout_doubles_the_95th_percentile():
+    # The 95th percentile of 20 samples is the 19th smallest one
+    samples = [i / 10 for i in range(20, 0, -1)]
+    assert profile_timeout(samples, 10) == 4
+
+
+def test_profile_timeout_is_capped_by_the_timeout():
+    assert profile_timeout([5.0] * 5, 3) == 3
+
+
+def test_profile_timeout_is_at_least_one_second():
+    assert profile_timeout([0.01] * 5, 10) == 1
+
+
+def test_record_profile_skips_the_tty_setting():
+    sendchar = ['__NL__', 'show version']
+    timings = [timing(0.1, 1), timing(0.2, 1), timing(0.3, 1)]
+    profile = dict()
+    record_profile(FakeModule(), profile, sendchar, timings)
+
+    assert profile == {'1': {profile_key('__NL__'): [0.2], profile_key('show version'): [0.3]}}
+
+
+def test_record_profile_ignores_the_sends_without_timeout():
+    sendchar = ['show version__NOWAIT__', '__HEX__:41', 'show clock__WAIT__:5']
+    timings = [timing(0.1, 2), timing(1.0, 2), timing(2.0, 2), timing(0.4, 2)]
+    profile = dict()
+    record_profile(FakeModule(), profile, sendchar, timings)
+
+    assert profile == {'2': {profile_key('show clock__WAIT__:5'): [0.4]}}
+
+
+def test_record_profile_keeps_the_ttys_apart():
+    # The settings carry no tty, the ttys follow each other
+    sendchar = ['show version']
+    timings = [timing(0.05), timing(0.1, 1), timing(0.2, 1), timing(0.1, 3), timing(0.6, 3)]
+    profile = dict()
+    record_profile(FakeModule(), profile, sendchar, timings)
+
+    key = profile_key('show version')
+    assert profile == {'1': {key: [0.2]}, '3': {key: [0.6]}}
+
+
+def test_record_profile_keeps_the_last_samples():
+    key = profile_key('show version')
+    profile = {'1': {key: [float(i) for i in range(PROFILE_SAMPLES)]}}
+    record_profile(FakeModule(), profile, ['show version'], [timing(0.1, 1), timing(0.5, 1)])
+
+    samples = profile['1'][key]
+    assert len(samples) == PROFILE_SAMPLES
+    assert samples[0] == 1.0
+    assert samples[-1] == 0.5
+
+
+@pytest.mark.parametrize('line, expected', [
+    (dict(baud=9600, bitchar=8, parity='none', stop=1), 960),
+    (dict(baud=115200, bitchar=7, parity='even', stop=2), 115200 / 11),
+])
+def test_chars_per_second(line, expected):
+    assert chars_per_second(line) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('cmd, nl, expected', [
+    ('__NL__', 'cr', 1),
+    ('__NL__', 'crlf', 2),
+    ('__CTL__:03', 'crlf', 1),
+    ('show version', 'cr', 13),
+    ('show version', 'crlf', 14),
+])
+def test_sendchar_size(cmd, nl, expected):
+    assert sendchar_size(cmd, nl) == expected
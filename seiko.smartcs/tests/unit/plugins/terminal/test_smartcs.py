@@ -0,0 +1,149 @@
+#
+# Copyright (c) 2026 Seiko Solutions Inc. all rights reserved.
+#
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Unit tests of the smartcs terminal plugin
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import re
+
+import pytest
+
+from ansible_collections.seiko.smartcs.plugins.terminal.smartcs import (
+    TERMINAL_COMMANDS,
+    TerminalModule,
+)
+
+
+PROMPT = b'(0)NS-2250> '
+
+# The regexes of the terminal plugin before they were merged and prefiltered
+LEGACY_STDOUT_RE = [
+    re.compile(br"(^|\r|\n)[*]?\([0-9]{1,3}\)(\[[0-9:]{8}\])?[a-zA-Z0-9][a-zA-Z0-9-_.]{0,63}(?:[>#])[ ]$")
+]
+
+LEGACY_STDERR_RE = [
+    re.compile(br"(\r|\n)Error:[^:\s][\S ]+\(\d*\)(\r|\n)"),
+    re.compile(br"(^|\r|\n)incorrect password"),
+    re.compile(br".* <-- no such command"),
+    re.compile(br".* <-- unexpected character( string)?"),
+    re.compile(br".* <-- open quotation"),
+    re.compile(br".* <-- quotation over"),
+    re.compile(br".* <-- syntax error"),
+    re.compile(br".* <-- too many parameters"),
+    re.compile(br".* <-- not enough parameter"),
+    re.compile(br".* <-- ambiguous parameter"),
+]
+
+OUTPUTS = [
+    b'',
+    b'show version\r\nSystem                : System Software Ver 2.1\r\n',
+    b'foo\r\nfoo <-- no such command\r\n',
+    b'set tty 1 baud 1 <-- syntax error',
+    b'set tty 1 label "a <-- b"\r\n',
+    b'set tty 1 label "x\r\n"x" <-- unexpected character string\r\n',
+    b'set tty <-- not enough parameter\r\n',
+    b'set tty 1 baud 9600 9600 <-- too many parameters\r\n',
+    b'set tty 1 b <-- ambiguous parameter\r\n',
+    b'set tty 1 b <--ambiguous parameter\r\n',
+    b'\r\nError: write failed (12)\r\n',
+    b'\nError:write failed (12)\n',
+    b'\nError::write failed (12)\n',
+    b'Error:write failed (12)\n',
+    b'\rError:write failed ()\r',
+    b'\nError:write failed\n',
+    b'incorrect password',
+    b'su\r\nPassword: \r\nincorrect password\r\n',
+    b'the incorrect password',
+    b'x' * 4096 + b'\r\nfoo <-- no such command\r\n',
+    b'x' * 4096 + b'\r\n(0)NS-2250> ',
+]
+
+PROMPTS = [
+    PROMPT,
+    b'(0)NS-2250# ',
+    b'*(12)[12:34:56]NS-2250# ',
+    b'show version\r\n(0)NS-2250> ',
+    b'(0)NS-2250> show version',
+    b'(0)NS-2250>',
+    b'(0)NS-2250> \n',
+    b'label (0)NS-2250> ',
+    b'\r' + b'x' * 4096 + b'\n(0)NS-2250# ',
+    b'\r\n(0)' + b'a' * 64 + b'# ',
+    b'\r\n(0)' + b'a' * 65 + b'# ',
+]
+
+
+class FakeConnection(object):
+    """ A shell that answers every command with the prompt """
+
+    def __init__(self):
+        self.sent = list()
+        self.pending = 0
+
+    def get_prompt(self):
+        return PROMPT
+
+    def send(self, command, sendonly=False):
+        self.sent.append(command)
+        self.pending += 1
+
+    def receive(self, strip_prompt=True):
+        pending, self.pending = self.pending, 0
+        return b'\n'.join([PROMPT] * pending)
+
+    def queue_message(self, level, message):
+        pass
+
+
+def test_terminal_parameters_are_set_on_each_shell():
+    connection = FakeConnection()
+    terminal = TerminalModule(connection)
+
+    terminal.on_open_shell()
+    assert connection.sent == list(TERMINAL_COMMANDS)
+
+    # A reconnect reuses the terminal plugin for a new shell
+    terminal.on_close_shell()
+    terminal.on_open_shell()
+    assert connection.sent == list(TERMINAL_COMMANDS) * 2
+
+
+def test_terminal_parameters_set_by_on_become_are_not_sent_again():
+    connection = FakeConnection()
+    terminal = TerminalModule(connection)
+
+    terminal._set_terminal_parameters()
+    terminal.on_open_shell()
+    assert connection.sent == list(TERMINAL_COMMANDS)
+
+    # Only the shell opened right after on_become is skipped
+    terminal.on_open_shell()
+    assert connection.sent == list(TERMINAL_COMMANDS) * 2
+
+
+def search(regexes, data):
+    for regex in regexes:
+        match = regex.search(data)
+        if match:
+            return match
+    return None
+
+
+@pytest.mark.parametrize('output', OUTPUTS)
+def test_terminal_stderr_re_matches_as_the_legacy_regexes(output):
+    assert bool(search(TerminalModule.terminal_stderr_re, output)) == bool(search(LEGACY_STDERR_RE, output))
+
+
+@pytest.mark.parametrize('output', PROMPTS + OUTPUTS)
+def test_terminal_stdout_re_matches_as_the_legacy_regexes(output):
+    match = search(TerminalModule.terminal_stdout_re, output)
+    legacy = search(LEGACY_STDOUT_RE, output)
+    assert bool(match) == bool(legacy)
+    if match:
+        assert match.group(0) == legacy.group(0)